@@ -14,5 +14,8 @@ python manage.py collectstatic --no-input
 # Apply database migrations
 python manage.py migrate
 
+# Create the cache table (no-op unless CACHE_BACKEND=db)
+python manage.py createcachetable
+
 # Create superuser if needed (optional - comment out if not needed)
 # python manage.py createsuperuser --no-input --username admin --email admin@example.com
@@ -64,8 +64,9 @@ INSTALLED_APPS = [
 SITE_ID = int(os.getenv('SITE_ID', '1'))
 
 MIDDLEWARE = [
+    'notifier.middleware.MetricsMiddleware',  # Response times for /metrics
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files
+    'notifier.middleware.AsyncWhiteNoiseMiddleware',  # Serve static files (WhiteNoise, ASGI-capable)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -93,6 +94,12 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'finance_alert.wsgi.application'
+ASGI_APPLICATION = 'finance_alert.asgi.application'
+
+# Serve the dashboard views (data wall, JSON API, export, image proxy) as
+# async views that hand blocking work to a bounded thread pool. Turn on when
+# running under an ASGI server (uvicorn finance_alert.asgi:application).
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
 
 
 # Database
@@ -125,6 +132,37 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# Google Sheets rows are cached here (see notifier.cache). Local memory is per
+# worker; use CACHE_BACKEND=file or CACHE_BACKEND=db so all gunicorn workers
+# share a single copy (db needs `python manage.py createcachetable`).
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+        }
+    }
+elif CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', 'finance_alert_cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'finance-alert',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
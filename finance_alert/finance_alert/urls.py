@@ -14,17 +14,38 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import os
+
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.contrib.sitemaps.views import sitemap
+from notifier.breaker import get_sheets_breaker
+from notifier.metrics import REGISTRY
 from notifier.sitemaps import StaticViewSitemap
 from django.views.generic import TemplateView
 
 
 def healthz(_request):
-    """Lightweight health check endpoint for Render."""
-    return JsonResponse({"ok": True})
+    """
+    Lightweight health check endpoint for Render.
+
+    Also reports the Google Sheets circuit breaker. An open breaker still
+    returns 200: the app keeps serving the last stored snapshot.
+    """
+    return JsonResponse({"ok": True, "sheets": get_sheets_breaker().status()})
+
+
+def metrics(request):
+    """
+    Prometheus metrics summed over every worker (see notifier.metrics).
+
+    When METRICS_TOKEN is set, scrapers must send it as a bearer token.
+    """
+    token = os.getenv('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 # Sitemap configuration
@@ -37,6 +58,7 @@ urlpatterns = [
     path('', include('notifier.urls')),
     path('users/', include('users.urls', namespace='users')),
     path('healthz/', healthz),
+    path('metrics', metrics),
     path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
     path('robots.txt', TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
 ]
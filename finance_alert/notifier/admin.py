@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ReminderLog
+from .models import Group, ReminderJob, ReminderLog, ReminderLogRollup, ReminderRun, SheetSnapshot
 
 
 @admin.register(ReminderLog)
@@ -7,11 +7,13 @@ class ReminderLogAdmin(admin.ModelAdmin):
     """
     Admin interface for viewing reminder send history.
     """
-    list_display = ['member_name', 'sent_at', 'status', 'balance_shown']
+    list_display = ['member_name', 'sent_at', 'status', 'balance_shown', 'attempts']
     list_filter = ['status', 'member_name', 'sent_at']
     search_fields = ['member_name', 'error_message']
-    readonly_fields = ['member_name', 'sent_at', 'status', 'error_message', 'balance_shown']
+    readonly_fields = ['member_name', 'sent_at', 'status', 'error_message', 'balance_shown', 'attempts']
     date_hierarchy = 'sent_at'
+    # Skip the extra COUNT(*) over the whole table on every changelist page
+    show_full_result_count = False
     
     def has_add_permission(self, request):
         """Disable manual creation - logs are auto-generated only."""
@@ -20,3 +22,87 @@ class ReminderLogAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         """Make logs read-only."""
         return False
+
+
+@admin.register(ReminderLogRollup)
+class ReminderLogRollupAdmin(admin.ModelAdmin):
+    """
+    Daily per-member counts for reminder logs past the retention window.
+    """
+    list_display = ['day', 'member_name', 'success', 'failed']
+    list_filter = ['member_name']
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        """Rollups are written by rollup_reminder_logs only."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Make rollups read-only."""
+        return False
+
+
+@admin.register(ReminderJob)
+class ReminderJobAdmin(admin.ModelAdmin):
+    """
+    Reminder runs queued by the cron endpoint and their progress.
+    """
+    list_display = ['id', 'key', 'status', 'created_at', 'started_at', 'finished_at', 'sent', 'failed']
+    list_filter = ['status', 'dry_run', 'run_date']
+    search_fields = ['key', 'error']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        """Jobs are queued through the cron endpoint only."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Make jobs read-only."""
+        return False
+
+
+@admin.register(ReminderRun)
+class ReminderRunAdmin(admin.ModelAdmin):
+    """
+    Per-run totals for reminder sends.
+    """
+    list_display = ['group_name', 'started_at', 'finished_at', 'total', 'succeeded', 'failed']
+    list_filter = ['group_name', 'started_at']
+    date_hierarchy = 'started_at'
+
+    def has_add_permission(self, request):
+        """Runs are recorded by send_daily_reminders only."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Make runs read-only."""
+        return False
+
+
+@admin.register(SheetSnapshot)
+class SheetSnapshotAdmin(admin.ModelAdmin):
+    """
+    Read-only view of stored Google Sheets snapshots.
+    """
+    list_display = ['doc_name', 'sheet_name', 'version', 'row_count', 'fetched_at', 'checked_at']
+    list_filter = ['doc_name', 'sheet_name']
+    exclude = ['rows']
+
+    def has_add_permission(self, request):
+        """Snapshots are written by the refresher only."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Make snapshots read-only."""
+        return False
+
+
+@admin.register(Group)
+class GroupAdmin(admin.ModelAdmin):
+    """
+    Savings groups and the Google Sheet each one is tracked in.
+    """
+    list_display = ['name', 'slug', 'doc_name', 'sheet_name', 'is_active']
+    list_filter = ['is_active']
+    search_fields = ['name', 'doc_name']
+    prepopulated_fields = {'slug': ['name']}
@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+from django.db import close_old_connections
+
+T = TypeVar("T")
+
+# Threads available to async views for blocking work (snapshot reads, Sheets
+# calls, upstream image fetches). Bounds how many such calls one ASGI
+# process has in flight; further requests queue on the event loop instead
+# of each holding a thread.
+DASHBOARD_EXECUTOR_WORKERS = int(os.getenv("DASHBOARD_EXECUTOR_WORKERS", "8"))
+# Items a streamed response takes from its blocking source per hop to the
+# pool. Export rows are tiny, so one hop per row would cost more than the
+# row itself; image chunks are 64 KiB, so keep this modest.
+DASHBOARD_STREAM_BATCH = int(os.getenv("DASHBOARD_STREAM_BATCH", "32"))
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+  """Process-wide bounded pool the async views hand blocking work to."""
+  global _EXECUTOR
+  if _EXECUTOR is None:
+    with _EXECUTOR_LOCK:
+      if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=DASHBOARD_EXECUTOR_WORKERS, thread_name_prefix="dashboard")
+  return _EXECUTOR
+
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+  """Run ``fn`` on the dashboard pool without blocking the event loop."""
+  loop = asyncio.get_running_loop()
+  return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _with_connections(fn: Callable[..., T], *args, **kwargs) -> T:
+  # Pool threads outlive requests, so give their database connections the
+  # same housekeeping Django does at the start and end of a request.
+  close_old_connections()
+  try:
+    return fn(*args, **kwargs)
+  finally:
+    close_old_connections()
+
+
+def _take(iterator, count: int) -> list:
+  return list(itertools.islice(iterator, count))
+
+
+async def iterate_blocking(iterable: Iterable[T], batch: int = DASHBOARD_STREAM_BATCH) -> AsyncIterator[T]:
+  """Async iterator over a blocking iterable, pulling ``batch`` items per hop to the pool."""
+  iterator = iter(iterable)
+  while True:
+    items = await run_blocking(_take, iterator, batch)
+    for item in items:
+      yield item
+    if len(items) < batch:
+      return
+
+
+def stream_async(response):
+  """
+  Switch a response streamed from a blocking iterator to async iteration,
+  so ASGI sends it chunk by chunk instead of consuming it on its one sync
+  thread. The response still closes the original source (upstream
+  connection, file) when it is done or the client goes away.
+  """
+  if response.streaming and not response.is_async:
+    response.streaming_content = iterate_blocking(response.streaming_content)
+  return response
+
+
+def offload(view):
+  """
+  Async version of a sync view that runs it, decorators included, on the
+  dashboard pool, with streamed responses switched to async iteration.
+  """
+  @functools.wraps(view)
+  async def wrapper(request, *args, **kwargs):
+    response = await run_blocking(_with_connections, view, request, *args, **kwargs)
+    return stream_async(response)
+
+  return wrapper
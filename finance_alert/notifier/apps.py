@@ -1,6 +1,20 @@
+import os
+
 from django.apps import AppConfig
 
 
 class NotifierConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifier'
+
+    def ready(self):
+        # Optionally keep sheet snapshots fresh from inside the web process.
+        # Alternatively run `python manage.py refresh_sheets --loop` separately.
+        if os.getenv('SHEETS_REFRESHER_THREAD', '').lower() in ('1', 'true', 'yes'):
+            from .refresher import start_refresher
+            start_refresher()
+        # Optionally load sheet snapshots into the cache right after boot,
+        # so the first visitor after a (cold) deploy doesn't wait for them.
+        if os.getenv('SHEETS_WARMUP', '').lower() in ('1', 'true', 'yes'):
+            from .refresher import start_warmup
+            start_warmup()
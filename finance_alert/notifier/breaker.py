@@ -0,0 +1,164 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional, TypeVar
+
+from django.core.cache import caches
+
+from .cache import SHEETS_CACHE_ALIAS
+from .metrics import SHEETS_FETCH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Consecutive failed Google Sheets calls before the breaker opens, and how
+# long it stays open before one trial call is let through.
+SHEETS_BREAKER_THRESHOLD = int(os.getenv("SHEETS_BREAKER_THRESHOLD", "3"))
+SHEETS_BREAKER_RESET_SECONDS = int(os.getenv("SHEETS_BREAKER_RESET_SECONDS", "60"))
+# Hard limit on one sheet call (open + read), after which it counts as failed
+# and the caller falls back to the last stored snapshot. Also used as the
+# gspread HTTP timeout.
+SHEETS_CALL_BUDGET = float(os.getenv("SHEETS_CALL_BUDGET", "10"))
+
+
+class CircuitOpenError(RuntimeError):
+  """Raised instead of calling Google while the breaker is open."""
+
+
+class SheetsCallTimeout(TimeoutError):
+  pass
+
+
+def is_sheets_outage(error: Exception) -> bool:
+  """
+  Whether a failed sheet call says Google is unhealthy. gspread errors other
+  than APIError (header validation, spreadsheet or tab not found) come from
+  an answer Google did give, so they don't count towards opening the breaker.
+  """
+  from gspread.exceptions import APIError, GSpreadException
+
+  return isinstance(error, APIError) or not isinstance(error, GSpreadException)
+
+
+class CircuitBreaker:
+  """
+  Consecutive-failure circuit breaker whose state lives in the Django cache,
+  so every worker sharing the cache backend trips and recovers together.
+
+  closed: calls go through; failures are counted.
+  open: calls fail fast with CircuitOpenError until ``reset_seconds`` pass.
+  half-open: one caller (chosen with ``cache.add``) makes a trial call; it
+  closes the breaker on success and re-opens it on failure.
+
+  Errors for which ``is_failure`` returns False are re-raised but count as
+  a successful call.
+  """
+
+  def __init__(
+    self,
+    name: str,
+    threshold: int = SHEETS_BREAKER_THRESHOLD,
+    reset_seconds: int = SHEETS_BREAKER_RESET_SECONDS,
+    budget: float = SHEETS_CALL_BUDGET,
+    alias: str = SHEETS_CACHE_ALIAS,
+    is_failure: Optional[Callable[[Exception], bool]] = None,
+  ):
+    self.name = name
+    self.threshold = threshold
+    self.reset_seconds = reset_seconds
+    self.budget = budget
+    self.alias = alias
+    self.is_failure = is_failure or (lambda error: True)
+    self.key = f"breaker:{name}"
+
+  @property
+  def backend(self):
+    return caches[self.alias]
+
+  def _load(self) -> dict:
+    return self.backend.get(self.key) or {"failures": 0, "opened_at": None, "last_error": ""}
+
+  def status(self) -> dict:
+    """Current state for health checks."""
+    data = self._load()
+    opened_at = data["opened_at"]
+    if opened_at is None:
+      state, retry_in = "closed", 0
+    else:
+      retry_in = max(0.0, opened_at + self.reset_seconds - time.time())
+      state = "open" if retry_in else "half-open"
+    return {
+      "state": state,
+      "failures": data["failures"],
+      "retry_in": round(retry_in, 1),
+      "last_error": data["last_error"],
+    }
+
+  def allow(self) -> bool:
+    """Whether a call may go to Google right now."""
+    data = self._load()
+    if data["opened_at"] is None:
+      return True
+    if time.time() - data["opened_at"] < self.reset_seconds:
+      return False
+    # Half-open: let exactly one trial call through per budget window
+    return self.backend.add(f"{self.key}:trial", 1, timeout=int(self.budget) + 1)
+
+  def record_success(self) -> None:
+    if self._load()["failures"]:
+      self.backend.delete(self.key)
+      logger.info("Sheets circuit %s closed", self.name)
+
+  def record_failure(self, error: Exception) -> None:
+    data = self._load()
+    data["failures"] += 1
+    data["last_error"] = f"{type(error).__name__}: {error}"[:200]
+    if data["failures"] >= self.threshold:
+      if data["opened_at"] is None:
+        logger.warning("Sheets circuit %s opened after %s failures: %s", self.name, data["failures"], error)
+      data["opened_at"] = time.time()
+    self.backend.set(self.key, data, timeout=None)
+
+  def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run ``fn`` if the breaker allows it, giving up after ``budget`` seconds.
+    The abandoned call keeps its thread until the gspread HTTP timeout (also
+    the budget) ends it, so timeouts cost a thread, not a request.
+    """
+    if not self.allow():
+      raise CircuitOpenError(f"Google Sheets circuit is open ({self.status()['last_error']})")
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheets-call")
+    call = getattr(fn, "__name__", "call").lstrip("_")
+    started = time.perf_counter()
+    try:
+      result = executor.submit(fn, *args, **kwargs).result(timeout=self.budget)
+    except FutureTimeout:
+      SHEETS_FETCH_SECONDS.observe(time.perf_counter() - started, call=call, outcome="timeout")
+      error = SheetsCallTimeout(f"Google Sheets call exceeded {self.budget:g}s")
+      self.record_failure(error)
+      raise error from None
+    except Exception as e:
+      SHEETS_FETCH_SECONDS.observe(time.perf_counter() - started, call=call, outcome="error")
+      if self.is_failure(e):
+        self.record_failure(e)
+      else:
+        self.record_success()
+      raise
+    finally:
+      executor.shutdown(wait=False)
+    SHEETS_FETCH_SECONDS.observe(time.perf_counter() - started, call=call, outcome="ok")
+    self.record_success()
+    return result
+
+
+_BREAKER: Optional[CircuitBreaker] = None
+
+
+def get_sheets_breaker() -> CircuitBreaker:
+  """The process-wide breaker guarding Google Sheets access."""
+  global _BREAKER
+  if _BREAKER is None:
+    _BREAKER = CircuitBreaker("google-sheets", is_failure=is_sheets_outage)
+  return _BREAKER
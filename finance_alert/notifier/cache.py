@@ -0,0 +1,225 @@
+import os
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from typing import Callable, Optional, TypeVar
+
+from django.core.cache import caches
+
+from .metrics import SHEETS_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Which Django cache alias holds sheet data. Point this at a file-based or
+# database cache (see CACHE_BACKEND in settings.py) so every gunicorn worker
+# shares one copy of the rows instead of each making its own Sheets call.
+SHEETS_CACHE_ALIAS = os.getenv("SHEETS_CACHE_ALIAS", "default")
+# How long rows are considered fresh.
+SHEETS_CACHE_TTL = int(os.getenv("SHEETS_CACHE_TTL", "300"))  # default 5 minutes
+# How long past the TTL stale rows may still be served while a refresh runs
+# (or while Google is unreachable).
+SHEETS_CACHE_STALE_TTL = int(os.getenv("SHEETS_CACHE_STALE_TTL", "86400"))
+# Upper bound on how long one worker may hold the refresh lock for a sheet.
+SHEETS_CACHE_LOCK_TIMEOUT = int(os.getenv("SHEETS_CACHE_LOCK_TIMEOUT", "30"))
+
+
+class LeaseHolderFailed(RuntimeError):
+  """The caller that held the load lease gave up without storing a result."""
+
+
+class SingleFlight:
+  """
+  In-process request coalescing: concurrent ``do(key, fn)`` calls for the
+  same key run ``fn`` once, and every other caller waits for (and shares)
+  that result or exception.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._calls = {}
+
+  def do(self, key: str, fn: Callable[[], list]) -> list:
+    with self._lock:
+      call = self._calls.get(key)
+      leader = call is None
+      if leader:
+        call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+
+    if not leader:
+      call["done"].wait()
+      if call["error"] is not None:
+        raise call["error"]
+      return call["result"]
+
+    try:
+      call["result"] = fn()
+      return call["result"]
+    except BaseException as e:
+      call["error"] = e
+      raise
+    finally:
+      with self._lock:
+        del self._calls[key]
+      call["done"].set()
+
+  def in_flight(self, key: str) -> bool:
+    with self._lock:
+      return key in self._calls
+
+
+class SheetCache:
+  """
+  Cache for sheet rows on top of Django's cache framework.
+
+  Entries carry their own TTL so different sheets can expire at different
+  rates. Once an entry goes stale it keeps being served while exactly one
+  caller (across all workers sharing the cache) refreshes it in the
+  background; the refresh lock is a plain ``cache.add`` so it works with the
+  local-memory, file-based and database backends alike.
+  """
+
+  def __init__(
+    self,
+    alias: str = SHEETS_CACHE_ALIAS,
+    ttl: int = SHEETS_CACHE_TTL,
+    stale_ttl: int = SHEETS_CACHE_STALE_TTL,
+    lock_timeout: int = SHEETS_CACHE_LOCK_TIMEOUT,
+  ):
+    self.alias = alias
+    self.ttl = ttl
+    self.stale_ttl = stale_ttl
+    self.lock_timeout = lock_timeout
+    self.flight = SingleFlight()
+
+  @property
+  def backend(self):
+    return caches[self.alias]
+
+  @staticmethod
+  def make_key(*parts) -> str:
+    """Build a short, backend-safe cache key from arbitrary parts."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f"sheets:{digest}"
+
+  def get_entry(self, key: str) -> Optional[dict]:
+    return self.backend.get(key)
+
+  def set_rows(self, key: str, rows: list, ttl: Optional[int] = None) -> dict:
+    ttl = self.ttl if ttl is None else ttl
+    entry = {"fetched_at": time.time(), "ttl": ttl, "rows": rows}
+    self.backend.set(key, entry, timeout=ttl + self.stale_ttl)
+    return entry
+
+  def acquire_lock(self, key: str) -> Optional[str]:
+    """Try to become the single refresher for ``key``; returns a token or None."""
+    token = uuid.uuid4().hex
+    if self.backend.add(f"{key}:lock", token, timeout=self.lock_timeout):
+      return token
+    return None
+
+  def release_lock(self, key: str, token: str) -> None:
+    lock_key = f"{key}:lock"
+    # Only drop the lock if we still own it; it may have expired and been
+    # taken by another worker in the meantime.
+    if self.backend.get(lock_key) == token:
+      self.backend.delete(lock_key)
+
+  def is_fresh(self, entry: dict, now: Optional[float] = None) -> bool:
+    now = time.time() if now is None else now
+    return (now - entry["fetched_at"]) < entry["ttl"]
+
+  def get_or_refresh(self, key: str, loader: Callable[[], list], ttl: Optional[int] = None) -> list:
+    """
+    Return cached rows for ``key``, calling ``loader`` to (re)fill the cache.
+
+    - Fresh entry: returned as-is.
+    - Stale entry: returned immediately; if no other thread or worker is
+      already doing it, a background thread refreshes it.
+    - No entry: exactly one load happens. Threads in this process coalesce
+      on a SingleFlight, so only one of them goes on to the cross-worker
+      lease (``cache.add`` with the lock timeout); the lease holder loads and
+      every other worker waits for its result (see lease()).
+    """
+    entry = self.get_entry(key)
+    if entry is not None:
+      fresh = self.is_fresh(entry)
+      SHEETS_CACHE_REQUESTS.inc(result="hit" if fresh else "stale")
+      if not fresh and not self.flight.in_flight(key):
+        token = self.acquire_lock(key)
+        if token:
+          threading.Thread(
+            target=self._refresh_in_background,
+            args=(key, loader, ttl, token),
+            daemon=True,
+          ).start()
+      return entry["rows"]
+
+    SHEETS_CACHE_REQUESTS.inc(result="miss")
+    return self.flight.do(key, lambda: self._load(key, loader, ttl))
+
+  def lease(self, key: str, lookup: Callable[[], Optional[T]], load: Callable[[], T]) -> T:
+    """
+    Cross-worker half of a load: return ``lookup()`` if it finds something,
+    otherwise run ``load`` if we win the lease on ``key``, otherwise wait
+    for the lease holder's result.
+
+    A waiter stops as soon as the lease is released: if the holder stored
+    nothing (its load raised), LeaseHolderFailed is raised at once rather
+    than every waiter calling Google in turn. Only a holder that neither
+    delivers nor releases within the lock timeout (a crashed worker) makes
+    a waiter load by itself.
+    """
+    found = lookup()
+    if found is not None:
+      return found
+
+    token = self.acquire_lock(key)
+    if token:
+      try:
+        return load()
+      finally:
+        self.release_lock(key, token)
+
+    lock_key = f"{key}:lock"
+    deadline = time.time() + self.lock_timeout
+    while time.time() < deadline:
+      time.sleep(0.1)
+      found = lookup()
+      if found is not None:
+        return found
+      if self.backend.get(lock_key) is None:
+        # Released: look once more in case it was stored just before that
+        found = lookup()
+        if found is not None:
+          return found
+        raise LeaseHolderFailed(f"Concurrent load of {key} failed")
+    # The lease holder never delivered (crashed or timed out); load ourselves.
+    return load()
+
+  def _load(self, key: str, loader: Callable[[], list], ttl: Optional[int]) -> list:
+    # Another thread may have filled the entry while we queued up
+    return self.lease(key, lambda: self.get_entry(key), lambda: self.set_rows(key, loader(), ttl))["rows"]
+
+  def _refresh_in_background(self, key: str, loader: Callable[[], list], ttl: Optional[int], token: str) -> None:
+    try:
+      self.flight.do(key, lambda: self.set_rows(key, loader(), ttl)["rows"])
+    except Exception:
+      # Keep serving the stale entry; the next request past the TTL retries.
+      logger.warning("Background sheet refresh failed for %s", key, exc_info=True)
+    finally:
+      self.release_lock(key, token)
+
+
+_SHEET_CACHE: Optional[SheetCache] = None
+
+
+def get_sheet_cache() -> SheetCache:
+  """Return the process-wide SheetCache configured from the environment."""
+  global _SHEET_CACHE
+  if _SHEET_CACHE is None:
+    _SHEET_CACHE = SheetCache()
+  return _SHEET_CACHE
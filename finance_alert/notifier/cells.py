@@ -0,0 +1,30 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+# Date formats seen in the daily log, tried in order (day-first as used in Kenya).
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d %b %Y', '%d %B %Y', '%b %d, %Y', '%d/%m/%y']
+
+
+def cell_text(value) -> str:
+  """Sheet cell as trimmed text ('' for blanks and None)."""
+  if value is None:
+    return ''
+  return str(value).strip()
+
+
+def parse_amount(text: str) -> Optional[Decimal]:
+  """Parse '+1,500', '-200' or '300' into a Decimal; None if not numeric."""
+  try:
+    return Decimal(text.replace('+', '').replace(',', ''))
+  except (InvalidOperation, ValueError):
+    return None
+
+
+def parse_date(text: str) -> Optional[date]:
+  for fmt in DATE_FORMATS:
+    try:
+      return datetime.strptime(text, fmt).date()
+    except ValueError:
+      continue
+  return None
@@ -0,0 +1,145 @@
+import os
+import queue
+import random
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .metrics import EMAIL_SEND_SECONDS
+
+# How many reminders go out per SMTP session before the connection is
+# recycled (many providers cap messages per session).
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "50"))
+# Parallel SMTP sessions; each worker keeps its own connection.
+REMINDER_CONCURRENCY = int(os.getenv("REMINDER_CONCURRENCY", "4"))
+# Retry policy for transient SMTP errors: exponential backoff with jitter,
+# bounded by a per-message deadline.
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "4"))
+REMINDER_BACKOFF_BASE = float(os.getenv("REMINDER_BACKOFF_BASE", "1"))
+REMINDER_BACKOFF_MAX = float(os.getenv("REMINDER_BACKOFF_MAX", "30"))
+REMINDER_SEND_DEADLINE = float(os.getenv("REMINDER_SEND_DEADLINE", "60"))
+
+
+class DeliveryResult:
+  """Outcome of delivering one message; ``finished_at`` is when its last attempt ended."""
+
+  __slots__ = ('message', 'sent', 'attempts', 'error', 'duration', 'finished_at')
+
+  def __init__(self, message: EmailMessage):
+    self.message = message
+    self.sent = 0
+    self.attempts = 0
+    self.error: Optional[Exception] = None
+    self.duration = 0.0
+    self.finished_at = None
+
+
+def is_transient(error: Exception) -> bool:
+  """
+  Whether a send failure is worth retrying: 4xx SMTP replies, dropped
+  connections and network errors. 5xx replies (bad address, auth failure)
+  are permanent.
+  """
+  if isinstance(error, smtplib.SMTPRecipientsRefused):
+    return bool(error.recipients) and all(400 <= code < 500 for code, _ in error.recipients.values())
+  if isinstance(error, smtplib.SMTPResponseException):
+    return 400 <= error.smtp_code < 500
+  if isinstance(error, smtplib.SMTPServerDisconnected):
+    return True
+  if isinstance(error, smtplib.SMTPException):
+    return False
+  # socket.timeout, ConnectionError and friends
+  return isinstance(error, OSError)
+
+
+def backoff_delay(attempt: int) -> float:
+  """Exponential backoff with full jitter for the given (1-based) attempt."""
+  cap = min(REMINDER_BACKOFF_MAX, REMINDER_BACKOFF_BASE * (2 ** (attempt - 1)))
+  return random.uniform(0, cap)
+
+
+def send_messages(
+  messages: List[EmailMessage],
+  batch_size: int = REMINDER_BATCH_SIZE,
+  concurrency: int = REMINDER_CONCURRENCY,
+  deadline: float = REMINDER_SEND_DEADLINE,
+  connection_factory: Optional[Callable] = None,
+) -> List[DeliveryResult]:
+  """
+  Deliver ``messages`` on a pool of ``concurrency`` workers.
+
+  Each worker holds one persistent connection and recycles it every
+  ``batch_size`` messages, so there is no TLS handshake per email. A slow
+  or failing recipient only holds up its own worker. Transient errors are
+  retried with exponential backoff and jitter until REMINDER_MAX_ATTEMPTS
+  or ``deadline`` seconds per message, whichever comes first.
+
+  Returns one DeliveryResult per message, in input order.
+  """
+  connection_factory = connection_factory or (
+    lambda: get_connection(fail_silently=False, timeout=deadline)
+  )
+  results = [DeliveryResult(message) for message in messages]
+  work: "queue.Queue[DeliveryResult]" = queue.Queue()
+  for result in results:
+    work.put(result)
+
+  def worker():
+    connection = None
+    sent_on_connection = 0
+    try:
+      while True:
+        try:
+          result = work.get_nowait()
+        except queue.Empty:
+          return
+        if connection is None or sent_on_connection >= batch_size:
+          _close(connection)
+          connection = connection_factory()
+          sent_on_connection = 0
+        _deliver(connection, result, deadline)
+        sent_on_connection += 1
+    finally:
+      _close(connection)
+
+  workers = max(1, min(concurrency, len(messages)))
+  with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reminder-send") as executor:
+    for future in [executor.submit(worker) for _ in range(workers)]:
+      future.result()
+  return results
+
+
+def _deliver(connection, result: DeliveryResult, deadline: float) -> None:
+  start = time.monotonic()
+  while True:
+    result.attempts += 1
+    try:
+      connection.open()
+      result.sent = connection.send_messages([result.message]) or 0
+      result.error = None
+      break
+    except Exception as e:
+      result.error = e
+      _close(connection)
+      if not is_transient(e) or result.attempts >= REMINDER_MAX_ATTEMPTS:
+        break
+      delay = backoff_delay(result.attempts)
+      if time.monotonic() - start + delay >= deadline:
+        break
+      time.sleep(delay)
+  result.duration = time.monotonic() - start
+  result.finished_at = timezone.now()
+  EMAIL_SEND_SECONDS.observe(result.duration, outcome="failed" if result.error else "sent")
+
+
+def _close(connection) -> None:
+  if connection is None:
+    return
+  try:
+    connection.close()
+  except Exception:
+    pass
@@ -0,0 +1,76 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List, Tuple, TypeVar
+
+from django.db import connections
+
+T = TypeVar("T")
+
+# Bounded pool for loading many sheets at once, and how long one sheet may
+# take before it's reported as timed out.
+SHEETS_FETCH_WORKERS = int(os.getenv("SHEETS_FETCH_WORKERS", "8"))
+SHEETS_FETCH_TIMEOUT = float(os.getenv("SHEETS_FETCH_TIMEOUT", "20"))
+
+
+class SheetFetchTimeout(TimeoutError):
+  pass
+
+
+def fetch_many(
+  fn: Callable[[T], object],
+  items: Iterable[T],
+  max_workers: int = SHEETS_FETCH_WORKERS,
+  timeout: float = SHEETS_FETCH_TIMEOUT,
+) -> List[Tuple[T, object]]:
+  """
+  Run ``fn(item)`` for every item on a bounded thread pool.
+
+  Returns ``(item, result)`` pairs in input order, where result is either
+  the return value or the exception raised. An item still running
+  ``timeout`` seconds after it started gets a SheetFetchTimeout instead of
+  holding up the rest; its thread is abandoned (Python threads can't be
+  killed), so a run over N sheets costs about as much as the slowest one
+  rather than the sum of all of them.
+  """
+  items = list(items)
+  if not items:
+    return []
+
+  results: List[object] = [None] * len(items)
+  started = {}
+
+  def run(i):
+    started[i] = time.monotonic()
+    try:
+      return fn(items[i])
+    finally:
+      # Worker threads get their own DB connections; don't leak them
+      connections.close_all()
+
+  executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))), thread_name_prefix="sheet-fetch")
+  futures = {executor.submit(run, i): i for i in range(len(items))}
+  pending = set(futures)
+  try:
+    while pending:
+      now = time.monotonic()
+      deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+      wait_for = max(0.05, min(deadlines) - now) if deadlines else 0.05
+      done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+      for future in done:
+        i = futures[future]
+        try:
+          results[i] = future.result()
+        except Exception as e:
+          results[i] = e
+
+      now = time.monotonic()
+      for future in list(pending):
+        i = futures[future]
+        if i in started and now - started[i] >= timeout:
+          results[i] = SheetFetchTimeout(f"timed out after {timeout:g}s")
+          pending.discard(future)
+  finally:
+    executor.shutdown(wait=False, cancel_futures=True)
+
+  return list(zip(items, results))
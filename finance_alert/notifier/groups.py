@@ -0,0 +1,59 @@
+from typing import Dict, List, Optional
+
+from .fetch import fetch_many
+from .models import Group
+from .schema import SheetSchema, member_email
+from .services import DAILY_LOG_DOC, DAILY_LOG_HEADERS, DAILY_LOG_SHEET, refresh_snapshot
+
+
+def default_group() -> Group:
+  """The original single-sheet setup, used until any Group is configured."""
+  return Group(name="Money Mates", slug="money-mates", doc_name=DAILY_LOG_DOC, sheet_name=DAILY_LOG_SHEET)
+
+
+def get_groups(slugs: Optional[List[str]] = None) -> List[Group]:
+  """
+  Active groups (optionally only those with the given slugs). Falls back to
+  the default group when no groups are configured at all.
+  """
+  groups = Group.objects.filter(is_active=True)
+  if not Group.objects.exists():
+    groups = [default_group()]
+  if slugs:
+    wanted = set(slugs)
+    groups = [group for group in groups if group.slug in wanted]
+  return list(groups)
+
+
+def group_members(group: Group, schema: SheetSchema) -> Dict[str, str]:
+  """
+  Member -> running balance column for ``group``: everyone in the sheet, or
+  only the members the group lists (matched case-insensitively).
+  """
+  if not group.members:
+    return dict(schema.members)
+  members = {}
+  for name in group.members:
+    member = schema.find_member(name)
+    if member:
+      members[member] = schema.members[member]
+  return members
+
+
+def group_email(group: Group, member: str) -> str:
+  emails = {name.lower(): email for name, email in (group.emails or {}).items()}
+  return emails.get(member.lower()) or member_email(member)
+
+
+def refresh_groups(groups: List[Group]) -> list:
+  """
+  Refresh every group's sheet snapshot concurrently (see fetch_many).
+  Groups sharing a sheet only fetch it once. Returns (group, snapshot or
+  exception) pairs.
+  """
+  sheets = list(dict.fromkeys((group.doc_name, group.sheet_name) for group in groups))
+  results = dict(fetch_many(
+    lambda sheet: refresh_snapshot(sheet[0], sheet[1], DAILY_LOG_HEADERS),
+    sheets,
+  ))
+  return [(group, results[(group.doc_name, group.sheet_name)]) for group in groups]
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+  import requests
+
+# Upper bound on a proxied image; larger bodies are refused or cut off.
+IMAGE_PROXY_MAX_BYTES = int(os.getenv("IMAGE_PROXY_MAX_BYTES", str(5 * 2**20)))
+# Upstream connect/read timeout in seconds.
+IMAGE_PROXY_TIMEOUT = float(os.getenv("IMAGE_PROXY_TIMEOUT", "10"))
+# On-disk cache location and total size; least recently used images are
+# evicted once the budget is exceeded.
+IMAGE_PROXY_CACHE_DIR = os.getenv("IMAGE_PROXY_CACHE_DIR", str(Path(settings.BASE_DIR) / ".cache" / "images"))
+IMAGE_PROXY_CACHE_BYTES = int(os.getenv("IMAGE_PROXY_CACHE_BYTES", str(100 * 2**20)))
+# How long a cached image is served without asking upstream, unless the
+# upstream Cache-Control says otherwise.
+IMAGE_PROXY_CACHE_TTL = int(os.getenv("IMAGE_PROXY_CACHE_TTL", "86400"))
+
+# Content types the proxy will pass on. SVG is left out on purpose: it can
+# carry scripts.
+ALLOWED_CONTENT_TYPES = frozenset(
+  os.getenv(
+    "IMAGE_PROXY_CONTENT_TYPES",
+    "image/png,image/jpeg,image/gif,image/webp,image/avif,image/bmp,image/x-icon,image/vnd.microsoft.icon",
+  ).split(",")
+)
+
+CHUNK_SIZE = 64 * 1024
+
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
+
+
+class ImageProxyError(Exception):
+  """Upstream image can't be proxied; ``status`` is the HTTP status to return."""
+
+  def __init__(self, message: str, status: int = 502):
+    super().__init__(message)
+    self.status = status
+
+
+def get_session() -> "requests.Session":
+  """
+  Process-wide Session so upstream connections are pooled and reused.
+  requests is imported here, on the first proxied image, to keep it out of
+  process start-up.
+  """
+  global _SESSION
+  if _SESSION is None:
+    with _SESSION_LOCK:
+      if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSION = session
+  return _SESSION
+
+
+def base_content_type(value: str) -> str:
+  return (value or "").split(";")[0].strip().lower()
+
+
+def freshness_lifetime(cache_control: str) -> Optional[int]:
+  """Seconds an upstream response may be reused; None if it must not be stored."""
+  directives = (cache_control or "").lower()
+  if "no-store" in directives or "private" in directives:
+    return None
+  if "no-cache" in directives:
+    return 0
+  match = re.search(r"max-age=(\d+)", directives)
+  return int(match.group(1)) if match else IMAGE_PROXY_CACHE_TTL
+
+
+class ImageCache:
+  """
+  Disk cache of proxied images keyed by URL.
+
+  Each entry is a body file plus a small JSON metadata file (content type,
+  ETag, Last-Modified, expiry). A hit touches the metadata file, so its
+  mtime orders entries for least-recently-used eviction, which runs after
+  every store until the total size fits ``max_bytes``. Files are written
+  to a temporary name and renamed into place, so concurrent workers never
+  see partial images.
+  """
+
+  def __init__(self, directory: str = IMAGE_PROXY_CACHE_DIR, max_bytes: int = IMAGE_PROXY_CACHE_BYTES):
+    self.directory = Path(directory)
+    self.max_bytes = max_bytes
+
+  def _paths(self, url: str):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return self.directory / f"{key}.img", self.directory / f"{key}.json"
+
+  def _read_meta(self, url: str) -> Optional[dict]:
+    _, meta = self._paths(url)
+    try:
+      with open(meta, encoding="utf-8") as f:
+        entry = json.load(f)
+    except (OSError, ValueError):
+      return None
+    return entry if entry.get("url") == url else None
+
+  def get(self, url: str) -> Optional[dict]:
+    """
+    Metadata of the cached entry for ``url`` with its body already opened
+    as ``file``, or None. Opening the body here means a concurrent eviction
+    that unlinks it can't break a response about to serve it; the caller
+    must close ``file``.
+    """
+    entry = self._read_meta(url)
+    if entry is None:
+      return None
+    body, _ = self._paths(url)
+    try:
+      entry["file"] = open(body, "rb")
+    except OSError:
+      return None
+    return entry
+
+  def touch(self, url: str, expires: Optional[float] = None) -> None:
+    """Mark an entry as just used (and optionally extend its expiry)."""
+    _, meta = self._paths(url)
+    if expires is not None:
+      entry = self._read_meta(url)
+      if entry:
+        entry["expires"] = expires
+        self._write_meta(meta, entry)
+        return
+    try:
+      os.utime(meta)
+    except OSError:
+      pass
+
+  def temp_file(self):
+    self.directory.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False)
+
+  def store(self, url: str, temp_path: str, entry: dict) -> None:
+    """Move a fully downloaded body into place and record its metadata."""
+    body, meta = self._paths(url)
+    os.replace(temp_path, body)
+    self._write_meta(meta, {**entry, "url": url})
+    self.evict()
+
+  def _write_meta(self, meta: Path, entry: dict) -> None:
+    with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".part", delete=False, encoding="utf-8") as f:
+      json.dump(entry, f)
+    os.replace(f.name, meta)
+
+  def evict(self) -> None:
+    """Drop least recently used entries until the cache fits its byte budget."""
+    # Leftovers of downloads interrupted by a crash
+    for part in self.directory.glob("*.part"):
+      try:
+        if part.stat().st_mtime < time.time() - 3600:
+          part.unlink()
+      except OSError:
+        pass
+
+    entries = []
+    total = 0
+    for meta in self.directory.glob("*.json"):
+      body = meta.with_suffix(".img")
+      try:
+        size = body.stat().st_size
+        used = meta.stat().st_mtime
+      except OSError:
+        continue
+      entries.append((used, meta, body, size))
+      total += size
+    entries.sort()
+    for _, meta, body, size in entries:
+      if total <= self.max_bytes:
+        break
+      for path in (meta, body):
+        try:
+          path.unlink()
+        except OSError:
+          pass
+      total -= size
+
+
+_CACHE: Optional[ImageCache] = None
+
+
+def get_image_cache() -> ImageCache:
+  global _CACHE
+  if _CACHE is None:
+    _CACHE = ImageCache()
+  return _CACHE
+
+
+def fetch_image(url: str, cache: Optional[ImageCache] = None):
+  """
+  Resolve ``url`` to either a cached file or a live upstream stream.
+
+  Returns ``(content_type, cached_file, chunks)`` where exactly one of
+  ``cached_file`` (an open binary file the caller must close) and
+  ``chunks`` is set. A fresh cache entry is served
+  without contacting upstream; a stale one is revalidated with
+  If-None-Match / If-Modified-Since and reused on 304. New images are
+  streamed to the caller while being written to the cache. Raises
+  ImageProxyError for upstream failures, disallowed types and oversize
+  bodies.
+  """
+  cache = cache or get_image_cache()
+  entry = cache.get(url)
+  if entry and entry.get("expires", 0) > time.time():
+    cache.touch(url)
+    return entry["content_type"], entry["file"], None
+
+  import requests
+
+  headers = {}
+  if entry:
+    if entry.get("etag"):
+      headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+      headers["If-Modified-Since"] = entry["last_modified"]
+
+  try:
+    resp = get_session().get(url, stream=True, timeout=IMAGE_PROXY_TIMEOUT, headers=headers)
+  except requests.RequestException as e:
+    if entry:
+      # Upstream down: a stale copy beats an error
+      return entry["content_type"], entry["file"], None
+    raise ImageProxyError(str(e))
+
+  lifetime = freshness_lifetime(resp.headers.get("Cache-Control", ""))
+  if resp.status_code == 304 and entry:
+    resp.close()
+    cache.touch(url, time.time() + (lifetime or 0))
+    return entry["content_type"], entry["file"], None
+  if entry:
+    entry["file"].close()
+
+  if resp.status_code != 200:
+    resp.close()
+    raise ImageProxyError(f"Upstream returned {resp.status_code}", status=resp.status_code)
+
+  content_type = base_content_type(resp.headers.get("Content-Type", ""))
+  if content_type not in ALLOWED_CONTENT_TYPES:
+    resp.close()
+    raise ImageProxyError(f"Content type {content_type or 'unknown'} not allowed", status=415)
+
+  length = resp.headers.get("Content-Length")
+  if length and length.isdigit() and int(length) > IMAGE_PROXY_MAX_BYTES:
+    resp.close()
+    raise ImageProxyError("Image too large", status=502)
+
+  entry = None
+  if lifetime is not None:
+    entry = {
+      "content_type": content_type,
+      "etag": resp.headers.get("ETag", ""),
+      "last_modified": resp.headers.get("Last-Modified", ""),
+      "expires": time.time() + lifetime,
+    }
+  return content_type, None, _stream(resp, url, cache, entry)
+
+
+def _stream(resp, url: str, cache: ImageCache, entry: Optional[dict]) -> Iterator[bytes]:
+  """
+  Yield the upstream body chunk by chunk, stopping at the size limit, and
+  cache it (when ``entry`` is given) once it has been read completely.
+  """
+  temp = None
+  if entry is not None:
+    try:
+      temp = cache.temp_file()
+    except OSError:
+      pass  # cache dir not writable: still proxy, just don't cache
+  received = 0
+  complete = False
+  try:
+    for chunk in resp.iter_content(CHUNK_SIZE):
+      received += len(chunk)
+      if received > IMAGE_PROXY_MAX_BYTES:
+        # Headers are already sent; cut the body short and cache nothing
+        return
+      if temp:
+        temp.write(chunk)
+      yield chunk
+    complete = True
+  finally:
+    resp.close()
+    if temp:
+      temp.close()
+      try:
+        if complete:
+          cache.store(url, temp.name, entry)
+        else:
+          os.unlink(temp.name)
+      except OSError:
+        pass
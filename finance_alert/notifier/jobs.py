@@ -0,0 +1,147 @@
+import io
+import os
+import logging
+import threading
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from django.core.management import call_command
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import ReminderJob
+
+logger = logging.getLogger(__name__)
+
+# Seconds the worker sleeps between checks for queued jobs (an enqueue in
+# the same process wakes it immediately).
+REMINDER_JOB_POLL_INTERVAL = int(os.getenv("REMINDER_JOB_POLL_INTERVAL", "30"))
+# A job still "running" after this many seconds is assumed lost (worker
+# restarted mid-run) and marked failed so it can be triggered again.
+REMINDER_JOB_TIMEOUT = int(os.getenv("REMINDER_JOB_TIMEOUT", "1800"))
+# "thread" runs queued jobs on a background thread of the web process that
+# enqueued them; "external" leaves them to `manage.py process_reminder_jobs`.
+REMINDER_JOB_WORKER = os.getenv("REMINDER_JOB_WORKER", "thread").lower()
+
+_WORKER: Optional[threading.Thread] = None
+_WAKE = threading.Event()
+
+
+def job_key(run_date, hour: int, groups: List[str], only: List[str], dry_run: bool) -> str:
+  """
+  Deduplication key: one job per day and hour (local time), group
+  selection and options. The hour keeps separately scheduled reminders on
+  the same day (e.g. 20:00 and 21:00) apart, while a scheduler retrying a
+  trigger within the hour still gets the existing job.
+  """
+  key = f"{run_date.isoformat()}T{hour:02d}:{','.join(sorted(groups)) or '*'}"
+  if only:
+    key += f":only={','.join(sorted(name.lower() for name in only))}"
+  if dry_run:
+    key += ":dry"
+  return key
+
+
+def enqueue_reminders(
+  groups: Optional[List[str]] = None,
+  only: Optional[List[str]] = None,
+  dry_run: bool = False,
+) -> Tuple[ReminderJob, bool]:
+  """
+  Queue a reminder run for today. Returns ``(job, created)``; when an
+  equivalent job for the current hour is already queued, running or done,
+  that job is returned instead of queueing another.
+  """
+  groups, only = list(groups or []), list(only or [])
+  now = timezone.localtime()
+  run_date = now.date()
+  key = job_key(run_date, now.hour, groups, only, dry_run)
+
+  existing = ReminderJob.objects.filter(key=key).exclude(status='failed').first()
+  if existing:
+    return existing, False
+  try:
+    with transaction.atomic():
+      job = ReminderJob.objects.create(key=key, run_date=run_date, groups=groups, only=only, dry_run=dry_run)
+  except IntegrityError:
+    # Lost a race with a concurrent trigger
+    return ReminderJob.objects.filter(key=key).exclude(status='failed').get(), False
+  _WAKE.set()
+  return job, True
+
+
+def fail_stale_jobs() -> int:
+  cutoff = timezone.now() - timedelta(seconds=REMINDER_JOB_TIMEOUT)
+  return ReminderJob.objects.filter(status='running', started_at__lt=cutoff).update(
+    status='failed', finished_at=timezone.now(), error='Worker stopped before the job finished'
+  )
+
+
+def claim_next_job() -> Optional[ReminderJob]:
+  """
+  Take the oldest queued job and mark it running. The conditional update
+  makes the claim safe with several workers polling the same table.
+  """
+  fail_stale_jobs()
+  for job_id in ReminderJob.objects.filter(status='queued').order_by('created_at').values_list('pk', flat=True)[:10]:
+    claimed = ReminderJob.objects.filter(pk=job_id, status='queued').update(
+      status='running', started_at=timezone.now()
+    )
+    if claimed:
+      return ReminderJob.objects.get(pk=job_id)
+  return None
+
+
+def run_job(job: ReminderJob) -> ReminderJob:
+  """Run a claimed job through send_daily_reminders and record the outcome."""
+  args = []
+  if job.dry_run:
+    args.append('--dry-run')
+  if job.only:
+    args.extend(['--only', *job.only])
+  if job.groups:
+    args.extend(['--group', *job.groups])
+
+  try:
+    # Output includes recipient addresses; don't keep it
+    call_command('send_daily_reminders', *args, job=job.pk, stdout=io.StringIO())
+    job.status, job.error = 'succeeded', ''
+  except Exception as e:
+    logger.exception("Reminder job %s failed", job.pk)
+    job.status, job.error = 'failed', str(e)
+  job.finished_at = timezone.now()
+  ReminderJob.objects.filter(pk=job.pk).update(status=job.status, error=job.error, finished_at=job.finished_at)
+  return job
+
+
+def process_jobs() -> int:
+  """Run queued jobs until none are left; returns how many were run."""
+  count = 0
+  while True:
+    job = claim_next_job()
+    if job is None:
+      return count
+    run_job(job)
+    count += 1
+
+
+def run_forever(interval: int = REMINDER_JOB_POLL_INTERVAL, stop: Optional[threading.Event] = None) -> None:
+  """Process queued jobs, checking every ``interval`` seconds, until ``stop`` is set."""
+  stop = stop or threading.Event()
+  while not stop.is_set():
+    _WAKE.clear()
+    close_old_connections()
+    try:
+      process_jobs()
+    except Exception:
+      logger.exception("Reminder job worker error")
+    _WAKE.wait(interval)
+
+
+def start_worker(interval: int = REMINDER_JOB_POLL_INTERVAL) -> threading.Thread:
+  """Start the in-process job worker thread once per process."""
+  global _WORKER
+  if _WORKER is None or not _WORKER.is_alive():
+    _WORKER = threading.Thread(target=run_forever, args=(interval,), name="reminder-jobs", daemon=True)
+    _WORKER.start()
+  return _WORKER
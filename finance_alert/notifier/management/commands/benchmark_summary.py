@@ -0,0 +1,159 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from notifier.rows import build_rows
+from notifier.services import _to_records
+from notifier.summary import SheetColumns, summarize_columns
+
+# The real daily log's member -> running balance columns
+DAILY_LOG_MEMBERS = {
+    'sultan': 'sultan running',
+    'Blessing': 'blessing running',
+    'cynthia': 'cynthia running',
+    'Allan': 'Allan running',
+}
+
+
+def per_member_scan(rows, members):
+    """The previous data_wall approach: one full pass over the rows per member."""
+    summary = {}
+    for member, running_key in members.items():
+        latest_balance = None
+        total_contributed = 0
+        days_contributed = 0
+        for row in rows:
+            balance_val = row.get(running_key, '')
+            if balance_val is not None and balance_val != '':
+                balance_val = str(balance_val).strip()
+                if balance_val:
+                    latest_balance = balance_val
+            contrib_val = row.get(member, '')
+            if contrib_val is not None and contrib_val != '':
+                contrib_val = str(contrib_val).strip()
+            if contrib_val and contrib_val not in ['-', '']:
+                days_contributed += 1
+                try:
+                    total_contributed += float(contrib_val.replace('+', '').replace(',', ''))
+                except ValueError:
+                    pass
+        summary[member] = {
+            'balance': latest_balance or '0',
+            'total_contributed': total_contributed,
+            'days_contributed': days_contributed,
+        }
+    return summary
+
+
+def synthetic_rows(count, members, seed=0):
+    """Daily-log shaped rows with a mix of numeric, '+N', '-' and blank cells."""
+    rng = random.Random(seed)
+    choices = ['+50', '+100', '-', '', 200, '1,000']
+    rows = []
+    for i in range(count):
+        row = {'Date': f"{i % 28 + 1}/{i % 12 + 1}/2025", 'challenge': ''}
+        for member, running_key in members.items():
+            row[member] = rng.choice(choices)
+            row[running_key] = rng.randint(-5000, 5000)
+        rows.append(row)
+    return rows
+
+
+def synthetic_values(count, members, seed=0):
+    """The same sheet as synthetic_rows() as Google returns it: a header row and rows of cell strings."""
+    headers = ['Date', *members, *members.values(), 'challenge']
+    rows = synthetic_rows(count, members, seed)
+    return headers, [[str(row.get(header, '')) for header in headers] for row in rows]
+
+
+def allocated(build):
+    """Run ``build`` and return (result, bytes it left allocated)."""
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the single-pass member summary engine against the per-member scan on synthetic sheets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            nargs='*',
+            type=int,
+            default=[10_000, 100_000, 1_000_000],
+            help='Synthetic sheet sizes to benchmark (default: 10k 100k 1M)',
+        )
+        parser.add_argument(
+            '--members',
+            type=int,
+            default=len(DAILY_LOG_MEMBERS),
+            help=f'Number of members (default {len(DAILY_LOG_MEMBERS)}, the real sheet)',
+        )
+        parser.add_argument(
+            '--memory',
+            action='store_true',
+            help='Compare memory of the raw row dicts against typed rows instead of timing summaries',
+        )
+
+    def handle(self, *args, **options):
+        members = dict(DAILY_LOG_MEMBERS)
+        for i in range(len(members), options['members']):
+            members[f'member{i}'] = f'member{i} running'
+        members = dict(list(members.items())[:options['members']])
+
+        if options['memory']:
+            self.compare_memory(options['rows'], members)
+            return
+
+        # per-member: the old per-request cost (one scan per member)
+        # parse once: building the columns, paid once per snapshot version
+        # per request: summarising already-parsed columns
+        self.stdout.write(
+            f"{'rows':>10} {'per-member':>12} {'parse once':>12} {'per request':>12} {'speedup':>8}"
+        )
+        for count in options['rows']:
+            rows = synthetic_rows(count, members)
+
+            start = time.perf_counter()
+            baseline = per_member_scan(rows, members)
+            scan_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            columns = SheetColumns(rows, members)
+            parse_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            summary = summarize_columns(columns)
+            summary_time = time.perf_counter() - start
+
+            for member, data in baseline.items():
+                ours = summary[member]
+                if (ours['balance'] != data['balance']
+                        or ours['days_contributed'] != data['days_contributed']
+                        or abs(ours['total_contributed'] - data['total_contributed']) > 1e-6):
+                    self.stdout.write(self.style.ERROR(f'Mismatch for {member} at {count} rows'))
+
+            self.stdout.write(
+                f"{count:>10} {scan_time:>11.3f}s {parse_time:>11.3f}s {summary_time:>11.4f}s "
+                f"{scan_time / summary_time:>7.0f}x"
+            )
+
+    def compare_memory(self, sizes, members):
+        """Bytes held by the raw record dicts (as _to_records returns them) vs the typed rows."""
+        self.stdout.write(f"{'rows':>10} {'dict rows':>12} {'typed rows':>12} {'ratio':>8}")
+        for count in sizes:
+            headers, values = synthetic_values(count, members)
+            _to_records(headers, [], None)  # gspread is imported on first use; keep that out of the figures
+            records, dict_size = allocated(lambda: _to_records(headers, values, None))
+            del values
+            _, typed_size = allocated(lambda: build_rows(records, members, 'Date', ['challenge']))
+            self.stdout.write(
+                f"{count:>10} {dict_size / 2**20:>10.1f}MB {typed_size / 2**20:>10.1f}MB "
+                f"{dict_size / typed_size:>7.1f}x"
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from notifier.jobs import REMINDER_JOB_POLL_INTERVAL, process_jobs, run_forever
+
+
+class Command(BaseCommand):
+    help = 'Run reminder jobs queued by the cron/send-reminders endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and pick up new jobs as they are queued instead of exiting when idle',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=REMINDER_JOB_POLL_INTERVAL,
+            help=f'Seconds between checks for queued jobs with --loop (default {REMINDER_JOB_POLL_INTERVAL})',
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            self.stdout.write(f"Processing reminder jobs every {options['interval']}s (Ctrl+C to stop)")
+            run_forever(options['interval'])
+            return
+
+        count = process_jobs()
+        self.stdout.write(self.style.SUCCESS(f'✓ Processed {count} reminder job(s)'))
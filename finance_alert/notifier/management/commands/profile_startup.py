@@ -0,0 +1,115 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter under -X importtime, so nothing is imported
+# yet. Prints the phase timings as JSON on the last stdout line.
+PROBE = r'''
+import json, os, sys, time
+sys.path.insert(0, {base_dir!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+phases = []
+mark = time.perf_counter()
+def phase(name):
+    global mark
+    now = time.perf_counter()
+    phases.append((name, now - mark))
+    mark = now
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+phase('settings')
+django.setup()
+phase('app registry ready')
+from django.urls import get_resolver
+get_resolver().url_patterns
+phase('URL resolver')
+if {app!r} == 'asgi':
+    from django.core.handlers.asgi import ASGIHandler
+    ASGIHandler().load_middleware(is_async=True)
+else:
+    from django.core.handlers.wsgi import WSGIHandler
+    WSGIHandler()
+phase('middleware ({app})')
+print(json.dumps(phases))
+'''
+
+
+def parse_importtime(stderr):
+    """(self_us, cumulative_us, depth, module) for each -X importtime line."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            imports.append((int(self_us), int(cumulative_us), (len(name) - len(name.lstrip()) - 1) // 2, name.strip()))
+        except ValueError:
+            continue
+    return imports
+
+
+class Command(BaseCommand):
+    help = 'Report where web process start-up time goes: imports (like python -X importtime), app registry, URL resolver and middleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of modules and packages to list (default 20)',
+        )
+        parser.add_argument(
+            '--app',
+            choices=['wsgi', 'asgi'],
+            default='wsgi',
+            help='Which handler to build when timing middleware (default wsgi)',
+        )
+
+    def handle(self, *args, **options):
+        probe = PROBE.format(
+            base_dir=str(settings.BASE_DIR),
+            settings_module=os.environ.get('DJANGO_SETTINGS_MODULE', 'finance_alert.settings'),
+            app=options['app'],
+        )
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', probe],
+            capture_output=True,
+            text=True,
+            cwd=str(settings.BASE_DIR),
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Start-up probe failed:\n{result.stderr[-2000:]}')
+
+        phases = json.loads(result.stdout.strip().splitlines()[-1])
+        imports = parse_importtime(result.stderr)
+        limit = options['limit']
+
+        self.stdout.write(self.style.SUCCESS('Start-up phases (fresh process):'))
+        for name, seconds in phases:
+            self.stdout.write(f'  {name:<24} {seconds * 1000:8.1f} ms')
+        self.stdout.write(f"  {'total':<24} {sum(s for _, s in phases) * 1000:8.1f} ms")
+
+        # Top-level imports only, so nested modules aren't counted twice
+        self.stdout.write(self.style.SUCCESS('\nSlowest top-level imports (cumulative):'))
+        for self_us, cumulative_us, _, name in sorted(
+            (i for i in imports if i[2] == 0), key=lambda i: -i[1]
+        )[:limit]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  {name}')
+
+        packages = defaultdict(int)
+        for self_us, _, _, name in imports:
+            packages[name.split('.')[0]] += self_us
+        self.stdout.write(self.style.SUCCESS('\nImport time by package (self):'))
+        for name, self_us in sorted(packages.items(), key=lambda p: -p[1])[:limit]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {name}')
+
+        self.stdout.write(
+            f'\n{len(imports)} modules imported, {sum(i[0] for i in imports) / 1000:.1f} ms in total. '
+            'Run `python -X importtime manage.py check` for the full tree.'
+        )
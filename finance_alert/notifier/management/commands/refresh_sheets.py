@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from notifier.refresher import SHEETS_REFRESH_INTERVAL, refresh_all, run_forever
+
+
+class Command(BaseCommand):
+    help = 'Pull Google Sheets data into stored snapshots so views never wait on Google'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and refresh on a schedule instead of once',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=SHEETS_REFRESH_INTERVAL,
+            help=f'Seconds between refreshes with --loop (default {SHEETS_REFRESH_INTERVAL})',
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            self.stdout.write(f"Refreshing sheet snapshots every {options['interval']}s (Ctrl+C to stop)")
+            run_forever(options['interval'])
+            return
+
+        failed = 0
+        for label, result in refresh_all():
+            if isinstance(result, Exception):
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'✗ {label}: {result}'))
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(f'✓ {label}: version {result.version} ({result.row_count} rows)')
+                )
+        if failed:
+            raise CommandError(f'{failed} sheet(s) failed to refresh')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from notifier.models import ReminderLog
+from notifier.retention import (
+    REMINDER_LOG_ARCHIVE_DIR,
+    REMINDER_LOG_RETENTION_DAYS,
+    REMINDER_LOG_ROLLUP_BATCH_SIZE,
+    retention_cutoff,
+    rollup_logs,
+)
+
+
+class Command(BaseCommand):
+    help = 'Roll reminder logs older than the retention window up into daily per-member counts and remove them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=REMINDER_LOG_RETENTION_DAYS,
+            help=f'Keep raw logs for this many days (default {REMINDER_LOG_RETENTION_DAYS}).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REMINDER_LOG_ROLLUP_BATCH_SIZE,
+            help=f'Rows rolled up and removed per transaction (default {REMINDER_LOG_ROLLUP_BATCH_SIZE}).',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            default=REMINDER_LOG_ARCHIVE_DIR,
+            help='Also write removed rows to gzipped JSON-lines files in this directory.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would be rolled up',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['days'])
+        if options['dry_run']:
+            count = ReminderLog.objects.filter(sent_at__lt=cutoff).count()
+            self.stdout.write(self.style.WARNING(f'[DRY RUN] Would roll up {count} log(s) sent before {cutoff:%Y-%m-%d}'))
+            return
+
+        removed = rollup_logs(options['days'], options['batch_size'], options['archive_dir'])
+        archived = f" (archived to {options['archive_dir']})" if options['archive_dir'] and removed else ''
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Rolled up {removed} log(s) sent before {cutoff:%Y-%m-%d}{archived}')
+        )
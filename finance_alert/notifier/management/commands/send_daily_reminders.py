@@ -1,9 +1,15 @@
 from django.core.management.base import BaseCommand
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 from django.conf import settings
-from notifier.services import get_all_rows
-from notifier.models import ReminderLog
-import os
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from notifier.delivery import REMINDER_BATCH_SIZE, REMINDER_CONCURRENCY, send_messages
+from notifier.groups import get_groups, group_email, group_members, refresh_groups
+from notifier.services import DAILY_LOG_HEADERS, get_snapshot_data
+from notifier.schema import schema_for
+from notifier.summary import snapshot_summaries
+from notifier.models import ReminderJob, ReminderLog, ReminderRun
 
 
 class Command(BaseCommand):
@@ -20,23 +26,94 @@ class Command(BaseCommand):
             nargs='*',
             help='Limit sending to one or more member names (e.g., --only Allan Blessing). Case-insensitive.',
         )
+        parser.add_argument(
+            '--group',
+            nargs='*',
+            help='Limit sending to one or more groups by slug (default: all active groups).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REMINDER_BATCH_SIZE,
+            help=f'Emails sent per SMTP connection before reconnecting (default {REMINDER_BATCH_SIZE}).',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=REMINDER_CONCURRENCY,
+            help=f'Number of emails sent in parallel, each over its own connection (default {REMINDER_CONCURRENCY}).',
+        )
         parser.add_argument(
             '--override-email',
             help='Send all selected reminders to this single email address (useful for testing).',
         )
+        parser.add_argument(
+            '--job',
+            type=int,
+            help='ReminderJob id to record progress on (set by the reminder job worker).',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         only_members = options.get('only') or []
         override_email = options.get('override_email')
+        batch_size = options['batch_size']
+        concurrency = options['concurrency']
+        job_id = options.get('job')
         
-        # Member email addresses (update these with actual emails)
-        members = {
-            'sultan': os.getenv('SULTAN_EMAIL', 'sultan@example.com'),
-            'Blessing': os.getenv('BLESSING_EMAIL', 'blessing@example.com'),
-            'cynthia': os.getenv('CYNTHIA_EMAIL', 'cynthia@example.com'),
-            'Allan': os.getenv('ALLAN_EMAIL', 'allan@example.com'),
-        }
+        groups = get_groups(options.get('group'))
+        if not groups:
+            self.stdout.write(self.style.ERROR('No matching groups found for --group'))
+            return
+        if job_id:
+            ReminderJob.objects.filter(pk=job_id).update(groups_total=len(groups))
+        
+        try:
+            # Pull the latest sheet data for every group concurrently; if
+            # Google is unreachable, fall back to the last stored snapshot
+            for group, result in refresh_groups(groups):
+                if isinstance(result, Exception):
+                    self.stdout.write(
+                        self.style.WARNING(f'⚠️ Could not refresh sheet for {group} ({result}); using last snapshot')
+                    )
+            
+            for group in groups:
+                if len(groups) > 1:
+                    self.stdout.write(self.style.MIGRATE_HEADING(f'\n{group.name}'))
+                run = self.send_group_reminders(
+                    group, dry_run, only_members, override_email, batch_size, concurrency, job_id
+                )
+                if job_id:
+                    ReminderJob.objects.filter(pk=job_id).update(
+                        groups_done=F('groups_done') + 1,
+                        sent=F('sent') + (run.succeeded if run else 0),
+                        failed=F('failed') + (run.failed if run else 0),
+                    )
+                
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error fetching contribution data: {str(e)}')
+            )
+            raise
+
+    def send_group_reminders(
+        self, group, dry_run, only_members, override_email,
+        batch_size=REMINDER_BATCH_SIZE, concurrency=REMINDER_CONCURRENCY, job_id=None,
+    ):
+        """Send one group's reminders; returns the recorded ReminderRun, if any."""
+        version, contributions = get_snapshot_data(
+            group.doc_name, group.sheet_name, DAILY_LOG_HEADERS
+        )
+        
+        if not contributions:
+            self.stdout.write(self.style.ERROR('No contribution data found'))
+            return
+        
+        # Members are detected from the sheet header (or listed on the group);
+        # emails come from the group, else <NAME>_EMAIL (e.g. SULTAN_EMAIL)
+        schema = schema_for(group.doc_name, group.sheet_name, version, contributions)
+        columns = group_members(group, schema)
+        members = {member: group_email(group, member) for member in columns}
 
         # Filter members if --only was provided (case-insensitive match)
         if only_members:
@@ -46,78 +123,28 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR('No matching members found for --only'))
                 return
         
-        try:
-            # Define expected headers to handle duplicate column names
-            expected_headers = [
-                'Date', 'sultan', 'Blessing', 'cynthia', 'Allan',
-                'challenge', 'sultan running', 'blessing running', 
-                'cynthia running', 'Allan running'
-            ]
-            
-            # Fetch contribution data from Google Sheets
-            contributions = get_all_rows(
-                "money mates tracker", 
-                "daily log",
-                expected_headers=expected_headers
-            )
+        # Get latest balances for each member in a single pass over the
+        # rows (same parsing rules as the dashboard)
+        selected = {member: columns[member] for member in members}
+        latest_data = snapshot_summaries(
+            group.doc_name, group.sheet_name, version, contributions, selected, schema.date_column or 'Date'
+        )
+        latest_data = {
+            member: {**data, 'date': data['date'].strftime('%d/%m/%Y') if data['date'] else 'Unknown'}
+            for member, data in latest_data.items()
+        }
+        
+        # Build every email first, then send them all over one connection
+        outgoing = []
+        for member, email in members.items():
+            data = latest_data[member]
+            balance = data['balance']
+            is_deficit = data['deficit']
             
-            if not contributions:
-                self.stdout.write(self.style.ERROR('No contribution data found'))
-                return
+            # Create personalized message
+            subject = f"💰 Daily Balance Update - {member.capitalize()}"
             
-            # Map member names to their running balance keys (case-sensitive as per sheet)
-            running_key_map = {
-                'sultan': 'sultan running',
-                'Blessing': 'blessing running',  # lowercase 'b' in sheet
-                'cynthia': 'cynthia running',
-                'Allan': 'Allan running',
-            }
-
-            # Get latest balances for each member
-            latest_data = {}
-            for member in members.keys():
-                running_key = running_key_map.get(member, f"{member} running")
-                contrib_key = member
-                
-                # Get the last non-empty balance
-                latest_balance = "0"
-                latest_contribution = "-"
-                latest_date = "Unknown"
-                
-                for row in reversed(contributions):
-                    balance_val = str(row.get(running_key, '')).strip()
-                    if balance_val and latest_balance == "0":
-                        latest_balance = balance_val
-                    
-                    contrib_val = str(row.get(contrib_key, '')).strip()
-                    if contrib_val and latest_contribution == "-":
-                        latest_contribution = contrib_val
-                    
-                    date_val = str(row.get('Date', '')).strip()
-                    if date_val and latest_date == "Unknown":
-                        latest_date = date_val
-                    
-                    # Break if we have all data
-                    if latest_balance != "0" and latest_contribution != "-":
-                        break
-                
-                latest_data[member] = {
-                    'balance': latest_balance,
-                    'last_contribution': latest_contribution,
-                    'date': latest_date
-                }
-            
-            # Send emails to each member
-            emails_sent = 0
-            for member, email in members.items():
-                data = latest_data[member]
-                balance = data['balance']
-                is_deficit = '-' in balance
-                
-                # Create personalized message
-                subject = f"💰 Daily Balance Update - {member.capitalize()}"
-                
-                message = f"""Hello {member.capitalize()},
+            message = f"""Hello {member.capitalize()},
 
 Here's your daily contribution update:
 
@@ -127,93 +154,118 @@ Last Contribution: {data['last_contribution']}
 Last Updated: {data['date']}
 
 """
-                
-                # Add summary of all members
-                message += "\n📊 Group Summary:\n"
-                message += "-" * 40 + "\n"
-                for m, d in latest_data.items():
-                    status = "🔴" if '-' in d['balance'] else "🟢"
-                    message += f"{status} {m.capitalize()}: {d['balance']}\n"
-                
-                message += "\n" + "-" * 40 + "\n"
-                
-                if is_deficit:
-                    message += "\n⚠️ You have a deficit. Please contribute to catch up!\n"
-                else:
-                    message += "\n✅ Great job staying on track!\n"
-                
-                message += f"\nView full tracker: {settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'http://localhost:8000'}\n"
-                message += "\n--\nMoney Mates Tracker\nAutomated Daily Reminder"
-                
-                # For testing, optionally override the recipient email
-                target_email = override_email or email
-
-                if dry_run:
-                    self.stdout.write(self.style.WARNING(f'\n[DRY RUN] Would send to {target_email}:'))
-                    self.stdout.write(subject)
-                    self.stdout.write(message)
-                    self.stdout.write('-' * 60)
-                else:
-                    try:
-                        # Check if we're using console backend (dev mode)
-                        using_console = 'console' in settings.EMAIL_BACKEND.lower()
-                        
-                        num_sent = send_mail(
-                            subject,
-                            message,
-                            settings.DEFAULT_FROM_EMAIL,
-                            [target_email],
-                            fail_silently=False,
-                        )
-                        
-                        if using_console:
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f'⚠️ Email printed to console (not sent) for {member} - '
-                                    f'Set EMAIL_BACKEND to smtp in .env to actually send'
-                                )
-                            )
-                            # Don't log as success if using console backend
-                        elif num_sent > 0:
-                            emails_sent += 1
-                            self.stdout.write(self.style.SUCCESS(f'✓ Sent reminder to {member} at {target_email}'))
-                            
-                            # Log successful send (no email address stored)
-                            ReminderLog.objects.create(
-                                member_name=member,
-                                status='success',
-                                balance_shown=balance
-                            )
-                        else:
-                            self.stdout.write(
-                                self.style.WARNING(f'⚠️ send_mail returned 0 for {member} (email may not have been sent)')
-                            )
-                            
-                    except Exception as e:
-                        error_msg = str(e)
-                        self.stdout.write(
-                            self.style.ERROR(f'✗ Failed to send to {member}: {error_msg}')
-                        )
-                        
-                        # Log failed send attempt (no email address stored)
-                        ReminderLog.objects.create(
-                            member_name=member,
-                            status='failed',
-                            balance_shown=balance,
-                            error_message=error_msg
-                        )
             
+            # Add summary of all members
+            message += "\n📊 Group Summary:\n"
+            message += "-" * 40 + "\n"
+            for m, d in latest_data.items():
+                status = "🔴" if d['deficit'] else "🟢"
+                message += f"{status} {m.capitalize()}: {d['balance']}\n"
+            
+            message += "\n" + "-" * 40 + "\n"
+            
+            if is_deficit:
+                message += "\n⚠️ You have a deficit. Please contribute to catch up!\n"
+            else:
+                message += "\n✅ Great job staying on track!\n"
+            
+            message += f"\nView full tracker: {settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'http://localhost:8000'}\n"
+            message += f"\n--\n{group.name} Tracker\nAutomated Daily Reminder"
+            
+            # For testing, optionally override the recipient email
+            target_email = override_email or email
+
             if dry_run:
+                self.stdout.write(self.style.WARNING(f'\n[DRY RUN] Would send to {target_email}:'))
+                self.stdout.write(subject)
+                self.stdout.write(message)
+                self.stdout.write('-' * 60)
+            else:
+                outgoing.append((
+                    member,
+                    balance,
+                    EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [target_email]),
+                ))
+        
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(f'\n[DRY RUN] Would have sent {len(members)} emails')
+            )
+            return
+        
+        # Check if we're using console backend (dev mode)
+        using_console = 'console' in settings.EMAIL_BACKEND.lower()
+        
+        # Log rows are buffered and written in one transaction at the end of
+        # the run instead of one INSERT per recipient; each log keeps the time
+        # its own delivery finished
+        logs = []
+        emails_sent = 0
+        started_at = timezone.now()
+        results = send_messages(
+            [email for _, _, email in outgoing], batch_size=batch_size, concurrency=concurrency
+        )
+        for (member, balance, email), result in zip(outgoing, results):
+            target_email = email.to[0]
+            if result.error is not None:
+                error_msg = str(result.error)
                 self.stdout.write(
-                    self.style.WARNING(f'\n[DRY RUN] Would have sent {len(members)} emails')
+                    self.style.ERROR(
+                        f'✗ Failed to send to {member} after {result.attempts} attempt(s): {error_msg}'
+                    )
                 )
-            else:
+                
+                # Log failed send attempt (no email address stored)
+                logs.append(ReminderLog(
+                    member_name=member,
+                    sent_at=result.finished_at,
+                    status='failed',
+                    balance_shown=balance,
+                    error_message=error_msg,
+                    attempts=result.attempts
+                ))
+            elif using_console:
                 self.stdout.write(
-                    self.style.SUCCESS(f'\n✓ Successfully sent {emails_sent}/{len(members)} reminder emails')
+                    self.style.WARNING(
+                        f'⚠️ Email printed to console (not sent) for {member} - '
+                        f'Set EMAIL_BACKEND to smtp in .env to actually send'
+                    )
                 )
+                # Don't log as success if using console backend
+            elif result.sent > 0:
+                emails_sent += 1
+                self.stdout.write(self.style.SUCCESS(f'✓ Sent reminder to {member} at {target_email}'))
                 
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'Error fetching contribution data: {str(e)}')
-            )
-            raise
+                # Log successful send (no email address stored)
+                logs.append(ReminderLog(
+                    member_name=member,
+                    sent_at=result.finished_at,
+                    status='success',
+                    balance_shown=balance,
+                    attempts=result.attempts
+                ))
+            else:
+                self.stdout.write(
+                    self.style.WARNING(f'⚠️ Email backend sent 0 messages for {member} (email may not have been sent)')
+                )
+        
+        run = None
+        if logs:
+            with transaction.atomic():
+                run = ReminderRun.objects.create(
+                    job_id=job_id,
+                    group_name=group.name,
+                    started_at=started_at,
+                    finished_at=timezone.now(),
+                    total=len(logs),
+                    succeeded=sum(1 for log in logs if log.status == 'success'),
+                    failed=sum(1 for log in logs if log.status == 'failed'),
+                )
+                for log in logs:
+                    log.run = run
+                ReminderLog.objects.bulk_create(logs)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✓ Successfully sent {emails_sent}/{len(members)} reminder emails')
+        )
+        return run
@@ -0,0 +1,310 @@
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Directory shared by every worker of a deployment (gunicorn workers, the
+# refresher, management commands). Each process writes its own values to a
+# file there and /metrics adds them all up, so a scrape that lands on any
+# worker sees the whole deployment. Use a directory that is emptied on each
+# deploy (e.g. under /tmp). Unset: /metrics only reports the answering
+# process.
+METRICS_DIR = os.getenv("METRICS_DIR", os.getenv("PROMETHEUS_MULTIPROC_DIR", ""))
+# How often (seconds) a process writes its values to METRICS_DIR.
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labelnames: Sequence[str], labels: dict) -> LabelKey:
+  if set(labels) != set(labelnames):
+    raise ValueError(f"Expected labels {sorted(labelnames)}, got {sorted(labels)}")
+  return tuple((name, str(labels[name])) for name in labelnames)
+
+
+def _escape(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+  labels = list(labels)
+  if not labels:
+    return ""
+  return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+  if value == math.inf:
+    return "+Inf"
+  return repr(float(value))
+
+
+class Counter:
+  """Monotonic count, e.g. cache hits."""
+
+  kind = "counter"
+
+  def __init__(self, registry: "Registry", name: str, documentation: str, labelnames: Sequence[str] = ()):
+    self.registry = registry
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+
+  def inc(self, amount: float = 1, **labels) -> None:
+    key = _label_key(self.labelnames, labels)
+    with self.registry.lock:
+      values = self.registry.values(self.name)
+      values[key] = values.get(key, 0) + amount
+    self.registry.maybe_flush()
+
+
+class Histogram:
+  """Distribution of observed values (seconds) over cumulative buckets."""
+
+  kind = "histogram"
+
+  def __init__(
+    self,
+    registry: "Registry",
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+  ):
+    self.registry = registry
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+  def observe(self, value: float, **labels) -> None:
+    key = _label_key(self.labelnames, labels)
+    with self.registry.lock:
+      values = self.registry.values(self.name)
+      # [count per bucket (cumulative)..., sum]
+      data = values.get(key)
+      if data is None:
+        data = values[key] = [0] * len(self.buckets) + [0.0]
+      for i, bound in enumerate(self.buckets):
+        if value <= bound:
+          data[i] += 1
+      data[-1] += value
+    self.registry.maybe_flush()
+
+  @contextmanager
+  def time(self, **labels):
+    """Observe how long the ``with`` block took."""
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.observe(time.perf_counter() - start, **labels)
+
+
+class Registry:
+  """
+  Minimal Prometheus-style metrics registry.
+
+  Counters and histograms are kept in memory per process and written as
+  JSON to ``directory``: on the first update, then by a daemon thread every
+  ``flush_interval`` seconds while there are unwritten changes, and at
+  exit. render() adds up the files of every process, which is how values
+  are aggregated across gunicorn workers; a worker that goes idle still
+  has its last updates on disk within one interval. Gauges are computed when
+  rendering by a callback, since a point-in-time value such as snapshot age
+  should not be summed over workers.
+  """
+
+  def __init__(self, directory: str = METRICS_DIR, flush_interval: float = METRICS_FLUSH_INTERVAL):
+    self.directory = Path(directory) if directory else None
+    self.flush_interval = flush_interval
+    self.lock = threading.Lock()
+    self.metrics: Dict[str, object] = {}
+    self.gauges: List[Tuple[str, str, Callable[[], Iterable[Tuple[dict, float]]]]] = []
+    self._values: Dict[str, Dict[LabelKey, object]] = {}
+    self._pid = os.getpid()
+    self._dirty = False
+    self._flusher: Optional[threading.Thread] = None
+    atexit.register(self.flush)
+
+  def _check_fork(self) -> None:
+    # A forked worker starts from zero rather than re-reporting its parent
+    if os.getpid() != self._pid:
+      self._pid = os.getpid()
+      self._values = {}
+
+  def values(self, name: str) -> Dict[LabelKey, object]:
+    """Live values of one metric in this process; call with ``lock`` held."""
+    self._check_fork()
+    return self._values.setdefault(name, {})
+
+  def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return self._register(Counter(self, name, documentation, labelnames))
+
+  def histogram(
+    self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+  ) -> Histogram:
+    return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+  def gauge(self, name: str, documentation: str, collect: Callable[[], Iterable[Tuple[dict, float]]]) -> None:
+    """Register a gauge whose ``(labels, value)`` samples ``collect`` returns at render time."""
+    self.gauges.append((name, documentation, collect))
+
+  def _register(self, metric):
+    if metric.name in self.metrics:
+      raise ValueError(f"Metric {metric.name} already registered")
+    self.metrics[metric.name] = metric
+    return metric
+
+  def _path(self) -> Path:
+    return self.directory / f"metrics-{os.getpid()}.json"
+
+  def _dump(self) -> dict:
+    with self.lock:
+      self._check_fork()
+      return {
+        name: [[list(map(list, key)), value] for key, value in values.items()]
+        for name, values in self._values.items()
+      }
+
+  def maybe_flush(self) -> None:
+    """Note an update; the first one is written at once, later ones by the flusher thread."""
+    if not self.directory:
+      return
+    self._dirty = True
+    # Also true in a forked worker, which doesn't inherit the thread
+    if self._flusher is None or not self._flusher.is_alive():
+      with self.lock:
+        if self._flusher is None or not self._flusher.is_alive():
+          self._flusher = threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True)
+          self._flusher.start()
+      self.flush()
+
+  def _flush_forever(self) -> None:
+    pid = os.getpid()
+    while os.getpid() == pid:
+      time.sleep(self.flush_interval)
+      if self._dirty:
+        self.flush()
+
+  def flush(self) -> None:
+    """Write this process's values to the shared directory."""
+    if not self.directory:
+      return
+    self._dirty = False
+    try:
+      self.directory.mkdir(parents=True, exist_ok=True)
+      with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False, encoding="utf-8") as f:
+        json.dump(self._dump(), f)
+      os.replace(f.name, self._path())
+    except OSError:
+      pass  # metrics must never break the app
+
+  def _collect(self) -> Dict[str, Dict[LabelKey, object]]:
+    """Values of every process: this one live, the others from their files."""
+    dumps = [self._dump()]
+    if self.directory:
+      own = self._path()
+      for path in self.directory.glob("metrics-*.json"):
+        if path == own:
+          continue
+        try:
+          with open(path, encoding="utf-8") as f:
+            dumps.append(json.load(f))
+        except (OSError, ValueError):
+          continue
+
+    merged: Dict[str, Dict[LabelKey, object]] = {}
+    for dump in dumps:
+      for name, samples in dump.items():
+        values = merged.setdefault(name, {})
+        for key, value in samples:
+          key = tuple(tuple(pair) for pair in key)
+          current = values.get(key)
+          if current is None:
+            values[key] = list(value) if isinstance(value, list) else value
+          elif isinstance(value, list):
+            values[key] = [a + b for a, b in zip(current, value)] if len(current) == len(value) else current
+          else:
+            values[key] = current + value
+    return merged
+
+  def render(self) -> str:
+    """All metrics in the Prometheus text exposition format."""
+    merged = self._collect()
+    lines = []
+    for name, metric in sorted(self.metrics.items()):
+      lines.append(f"# HELP {name} {metric.documentation}")
+      lines.append(f"# TYPE {name} {metric.kind}")
+      for key, value in sorted(merged.get(name, {}).items()):
+        if metric.kind == "counter":
+          lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+          continue
+        if len(value) != len(metric.buckets) + 1:
+          continue  # written with other buckets by an older process
+        for bound, count in zip(metric.buckets, value):
+          lines.append(f"{name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {_format_value(count)}")
+        lines.append(f"{name}_sum{_format_labels(key)} {_format_value(value[-1])}")
+        lines.append(f"{name}_count{_format_labels(key)} {_format_value(value[-2])}")
+
+    for name, documentation, collect in self.gauges:
+      lines.append(f"# HELP {name} {documentation}")
+      lines.append(f"# TYPE {name} gauge")
+      try:
+        samples = list(collect())
+      except Exception:
+        samples = []
+      for labels, value in samples:
+        lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SHEETS_CACHE_REQUESTS = REGISTRY.counter(
+  "finance_alert_sheets_cache_requests_total",
+  "Sheet row lookups in the shared cache by result (hit, stale, miss, error).",
+  ["result"],
+)
+SHEETS_FETCH_SECONDS = REGISTRY.histogram(
+  "finance_alert_sheets_fetch_seconds",
+  "Duration of Google Sheets calls made through the circuit breaker.",
+  ["call", "outcome"],
+)
+VIEW_SECONDS = REGISTRY.histogram(
+  "finance_alert_view_seconds",
+  "Time to produce a response, by URL name.",
+  ["view", "method"],
+)
+EMAIL_SEND_SECONDS = REGISTRY.histogram(
+  "finance_alert_email_send_seconds",
+  "Time to deliver one reminder email, retries included.",
+  ["outcome"],
+)
+
+
+def _snapshot_ages():
+  from django.db.models import Max
+
+  from .models import SheetSnapshot
+
+  now = time.time()
+  latest = SheetSnapshot.objects.values("doc_name", "sheet_name").annotate(checked_at=Max("checked_at"))
+  for row in latest:
+    if row["checked_at"] is not None:
+      yield {"doc": row["doc_name"], "sheet": row["sheet_name"]}, now - row["checked_at"].timestamp()
+
+
+REGISTRY.gauge(
+  "finance_alert_sheets_snapshot_age_seconds",
+  "Seconds since each sheet's stored snapshot was last checked against Google.",
+  _snapshot_ages,
+)
@@ -0,0 +1,81 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .aio import stream_async
+from .metrics import VIEW_SECONDS
+
+METRIC_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+  """
+  WhiteNoiseMiddleware that also runs natively under ASGI.
+
+  WhiteNoise is sync-only, and a single sync middleware makes Django run
+  every request below it on its one sync thread, which would undo the async
+  dashboard views. Static lookups are in-memory, so the async path does the
+  same lookup and only streams the file through the dashboard pool.
+  """
+
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response=None, *args, **kwargs):
+    super().__init__(get_response, *args, **kwargs)
+    if iscoroutinefunction(get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    return super().__call__(request)
+
+  async def __acall__(self, request):
+    if self.autorefresh:
+      static_file = self.find_file(request.path_info)
+    else:
+      static_file = self.files.get(request.path_info)
+    if static_file is not None:
+      return stream_async(self.serve(static_file, request))
+    return await self.get_response(request)
+
+
+class MetricsMiddleware:
+  """
+  Records how long each response took in the view-time histogram, labelled
+  with the matched URL name (unmatched paths share one label, so scanners
+  can't blow up the label set).
+  """
+
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    if iscoroutinefunction(get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    started = time.perf_counter()
+    response = self.get_response(request)
+    self._observe(request, started)
+    return response
+
+  async def __acall__(self, request):
+    started = time.perf_counter()
+    response = await self.get_response(request)
+    self._observe(request, started)
+    return response
+
+  @staticmethod
+  def _observe(request, started):
+    match = request.resolver_match
+    VIEW_SECONDS.observe(
+      time.perf_counter() - started,
+      view=match.view_name if match else 'unmatched',
+      method=request.method if request.method in METRIC_METHODS else 'other',
+    )
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SheetSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_name', models.CharField(help_text='Name of the Google Sheet document', max_length=200)),
+                ('sheet_name', models.CharField(blank=True, help_text='Worksheet tab (blank for the first sheet)', max_length=200)),
+                ('version', models.PositiveIntegerField(help_text='Increments every time the sheet content changes')),
+                ('content_hash', models.CharField(help_text='SHA-256 of the rows, used to detect changes', max_length=64)),
+                ('rows', models.JSONField(default=list, help_text='Sheet rows as a list of header -> value dicts')),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('fetched_at', models.DateTimeField(auto_now_add=True, help_text='When this version was first fetched')),
+                ('checked_at', models.DateTimeField(help_text='When the sheet was last confirmed to match this version')),
+            ],
+            options={
+                'verbose_name': 'Sheet Snapshot',
+                'verbose_name_plural': 'Sheet Snapshots',
+                'ordering': ['-version'],
+                'constraints': [models.UniqueConstraint(fields=('doc_name', 'sheet_name', 'version'), name='unique_sheet_snapshot_version')],
+            },
+        ),
+    ]
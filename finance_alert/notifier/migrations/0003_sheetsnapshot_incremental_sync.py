@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0002_sheetsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sheetsnapshot',
+            name='full_synced_at',
+            field=models.DateTimeField(blank=True, help_text='When the whole sheet was last re-downloaded', null=True),
+        ),
+        migrations.AddField(
+            model_name='sheetsnapshot',
+            name='headers',
+            field=models.JSONField(default=list, help_text='Header row as read from the sheet (used for incremental sync)'),
+        ),
+        migrations.AlterField(
+            model_name='sheetsnapshot',
+            name='row_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of data rows synced from the sheet'),
+        ),
+    ]
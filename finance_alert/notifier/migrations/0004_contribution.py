@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0003_sheetsnapshot_incremental_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_name', models.CharField(max_length=200)),
+                ('sheet_name', models.CharField(blank=True, max_length=200)),
+                ('version', models.PositiveIntegerField(help_text='Snapshot version this row was ingested from')),
+                ('position', models.PositiveIntegerField(help_text='Row order in the sheet (0 = first data row)')),
+                ('member', models.CharField(max_length=100)),
+                ('date', models.DateField(blank=True, help_text="Parsed from the sheet's Date column (empty if unparseable)", null=True)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, help_text='Amount contributed that day (empty if nothing was contributed)', max_digits=14, null=True)),
+                ('running_balance', models.DecimalField(blank=True, decimal_places=2, help_text="Member's running balance after that day", max_digits=14, null=True)),
+                ('amount_text', models.CharField(blank=True, max_length=50)),
+                ('balance_text', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'ordering': ['position'],
+                'indexes': [models.Index(fields=['member', 'date'], name='contribution_member_date'), models.Index(fields=['doc_name', 'sheet_name', 'member', 'position'], name='contribution_member_position')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0004_contribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Group',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(unique=True)),
+                ('doc_name', models.CharField(help_text='Name of the Google Sheet document', max_length=200)),
+                ('sheet_name', models.CharField(blank=True, help_text='Worksheet tab (blank for the first sheet)', max_length=200)),
+                ('members', models.JSONField(blank=True, default=list, help_text='Member column names to include (empty = every member found in the sheet)')),
+                ('emails', models.JSONField(blank=True, default=dict, help_text='Reminder recipients, e.g. {"Allan": "allan@example.com"}')),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
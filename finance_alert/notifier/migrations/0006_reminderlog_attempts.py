@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0005_group'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminderlog',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=1, help_text='How many delivery attempts were made (including retries)'),
+        ),
+    ]
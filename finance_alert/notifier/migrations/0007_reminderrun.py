@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0006_reminderlog_attempts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group_name', models.CharField(blank=True, help_text='Group the reminders were sent for', max_length=100)),
+                ('started_at', models.DateTimeField(help_text='When sending started')),
+                ('finished_at', models.DateTimeField(help_text='When sending finished')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Reminders attempted')),
+                ('succeeded', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Reminder Run',
+                'verbose_name_plural': 'Reminder Runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='reminderlog',
+            name='run',
+            field=models.ForeignKey(blank=True, help_text='The reminder run this send belonged to', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='logs', to='notifier.reminderrun'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0007_reminderrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Run date, groups and options used to deduplicate triggers', max_length=255)),
+                ('run_date', models.DateField(help_text='Day the reminders are for')),
+                ('groups', models.JSONField(blank=True, default=list, help_text='Group slugs (empty for all active groups)')),
+                ('only', models.JSONField(blank=True, default=list, help_text='Member names to limit sending to')),
+                ('dry_run', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('groups_total', models.PositiveIntegerField(default=0)),
+                ('groups_done', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Reminder Job',
+                'verbose_name_plural': 'Reminder Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='notifier_re_status_7c028b_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'failed'), _negated=True), fields=('key',), name='reminderjob_unique_active_key')],
+            },
+        ),
+        migrations.AddField(
+            model_name='reminderrun',
+            name='job',
+            field=models.ForeignKey(blank=True, help_text='The queued job that started this run, if any', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='runs', to='notifier.reminderjob'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0008_reminderjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reminderlog',
+            index=models.Index(fields=['sent_at', 'id'], name='notifier_re_sent_at_2b5e79_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminderlog',
+            index=models.Index(fields=['member_name', 'sent_at'], name='notifier_re_member__ff7137_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminderlog',
+            index=models.Index(fields=['status', 'sent_at'], name='notifier_re_status_0229ef_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0009_reminderlog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderLogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('member_name', models.CharField(max_length=100)),
+                ('success', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Reminder Log Rollup',
+                'verbose_name_plural': 'Reminder Log Rollups',
+                'ordering': ['-day', 'member_name'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'member_name'), name='reminderlogrollup_unique_day_member')],
+            },
+        ),
+    ]
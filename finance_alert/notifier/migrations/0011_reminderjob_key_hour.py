@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0010_reminderlogrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reminderjob',
+            name='key',
+            field=models.CharField(help_text='Run date and hour, groups and options used to deduplicate triggers', max_length=255),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0011_reminderjob_key_hour'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reminderlog',
+            name='sent_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the reminder was sent'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifier', '0012_reminderlog_sent_at_default'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='Contribution',
+        ),
+    ]
@@ -1,4 +1,100 @@
 from django.db import models
+from django.utils import timezone
+
+
+class ReminderJob(models.Model):
+    """
+    A queued request to send reminders, created by the cron endpoint and
+    picked up by the reminder worker so the HTTP request returns at once.
+
+    ``key`` identifies the day/hour/group/options of the run; only one job
+    per key may be queued, running or done, so repeated triggers within
+    the hour are ignored (a failed job can be triggered again).
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    key = models.CharField(max_length=255, help_text="Run date and hour, groups and options used to deduplicate triggers")
+    run_date = models.DateField(help_text="Day the reminders are for")
+    groups = models.JSONField(default=list, blank=True, help_text="Group slugs (empty for all active groups)")
+    only = models.JSONField(default=list, blank=True, help_text="Member names to limit sending to")
+    dry_run = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    groups_total = models.PositiveIntegerField(default=0)
+    groups_done = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Reminder Job"
+        verbose_name_plural = "Reminder Jobs"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=~models.Q(status='failed'),
+                name='reminderjob_unique_active_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} - {self.key} ({self.status})"
+
+    @property
+    def duration(self):
+        if not self.started_at:
+            return None
+        return (self.finished_at or timezone.now()) - self.started_at
+
+
+class ReminderRun(models.Model):
+    """
+    One run of the daily reminder command for one group, with its totals,
+    so history can be shown per run without scanning individual logs.
+    """
+
+    group_name = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Group the reminders were sent for"
+    )
+    started_at = models.DateTimeField(help_text="When sending started")
+    finished_at = models.DateTimeField(help_text="When sending finished")
+    total = models.PositiveIntegerField(default=0, help_text="Reminders attempted")
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    job = models.ForeignKey(
+        ReminderJob,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='runs',
+        help_text="The queued job that started this run, if any"
+    )
+
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name = "Reminder Run"
+        verbose_name_plural = "Reminder Runs"
+
+    def __str__(self):
+        return f"{self.group_name or 'Reminders'} - {self.started_at.strftime('%Y-%m-%d %H:%M')} ({self.succeeded}/{self.total})"
+
+    @property
+    def duration(self):
+        return self.finished_at - self.started_at
 
 
 class ReminderLog(models.Model):
@@ -19,7 +115,7 @@ class ReminderLog(models.Model):
         help_text="Name of the member who received the reminder"
     )
     sent_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
         help_text="When the reminder was sent"
     )
     status = models.CharField(
@@ -38,11 +134,158 @@ class ReminderLog(models.Model):
         blank=True,
         help_text="The balance value shown in the reminder (for reference)"
     )
+    attempts = models.PositiveSmallIntegerField(
+        default=1,
+        help_text="How many delivery attempts were made (including retries)"
+    )
+    run = models.ForeignKey(
+        ReminderRun,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='logs',
+        help_text="The reminder run this send belonged to"
+    )
     
     class Meta:
         ordering = ['-sent_at']
         verbose_name = "Reminder Log"
         verbose_name_plural = "Reminder Logs"
+        indexes = [
+            # Keyset pagination of the history page, newest first
+            models.Index(fields=['sent_at', 'id']),
+            # Per-member and per-status history / stats over a date range
+            models.Index(fields=['member_name', 'sent_at']),
+            models.Index(fields=['status', 'sent_at']),
+        ]
     
     def __str__(self):
         return f"{self.member_name} - {self.sent_at.strftime('%Y-%m-%d %H:%M')} ({self.status})"
+
+
+class ReminderLogRollup(models.Model):
+    """
+    Daily per-member reminder counts kept after the raw ReminderLog rows
+    for that day pass the retention window (see rollup_reminder_logs).
+    """
+
+    day = models.DateField()
+    member_name = models.CharField(max_length=100)
+    success = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day', 'member_name']
+        verbose_name = "Reminder Log Rollup"
+        verbose_name_plural = "Reminder Log Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'member_name'], name='reminderlogrollup_unique_day_member'),
+        ]
+
+    def __str__(self):
+        return f"{self.member_name} - {self.day} ({self.success} ok, {self.failed} failed)"
+
+
+class SheetSnapshot(models.Model):
+    """
+    Versioned copy of a Google Sheets worksheet.
+
+    Written by the background refresher so views can serve the last known
+    rows without waiting on Google. A new version is only created when the
+    sheet content actually changes.
+    """
+
+    doc_name = models.CharField(
+        max_length=200,
+        help_text="Name of the Google Sheet document"
+    )
+    sheet_name = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Worksheet tab (blank for the first sheet)"
+    )
+    version = models.PositiveIntegerField(
+        help_text="Increments every time the sheet content changes"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        help_text="SHA-256 of the rows, used to detect changes"
+    )
+    headers = models.JSONField(
+        default=list,
+        help_text="Header row as read from the sheet (used for incremental sync)"
+    )
+    rows = models.JSONField(
+        default=list,
+        help_text="Sheet rows as a list of header -> value dicts"
+    )
+    row_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of data rows synced from the sheet"
+    )
+    fetched_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When this version was first fetched"
+    )
+    checked_at = models.DateTimeField(
+        help_text="When the sheet was last confirmed to match this version"
+    )
+    full_synced_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the whole sheet was last re-downloaded"
+    )
+
+    class Meta:
+        ordering = ['-version']
+        verbose_name = "Sheet Snapshot"
+        verbose_name_plural = "Sheet Snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['doc_name', 'sheet_name', 'version'],
+                name='unique_sheet_snapshot_version',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.doc_name}/{self.sheet_name or '(first sheet)'} v{self.version}"
+
+
+class Group(models.Model):
+    """
+    A savings group tracked from its own Google Sheet.
+
+    Members are detected from the sheet header unless ``members`` lists a
+    subset to use. ``emails`` maps member names to reminder addresses;
+    members without an entry fall back to the <NAME>_EMAIL env var.
+    """
+
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(unique=True)
+    doc_name = models.CharField(
+        max_length=200,
+        help_text="Name of the Google Sheet document"
+    )
+    sheet_name = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Worksheet tab (blank for the first sheet)"
+    )
+    members = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Member column names to include (empty = every member found in the sheet)"
+    )
+    emails = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Reminder recipients, e.g. {"Allan": "allan@example.com"}'
+    )
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
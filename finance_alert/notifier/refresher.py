@@ -0,0 +1,111 @@
+import os
+import time
+import logging
+import threading
+from typing import Optional
+
+from django.db import close_old_connections, connections
+
+from .groups import get_groups, refresh_groups
+from .rows import warm_rows
+from .services import DAILY_LOG_HEADERS, get_snapshot, get_snapshot_data, refresh_token_if_expiring
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background pulls of the group sheets.
+SHEETS_REFRESH_INTERVAL = int(os.getenv("SHEETS_REFRESH_INTERVAL", "300"))
+
+# Seconds after boot before the optional warm-up starts, so it doesn't
+# compete with the server binding its port.
+SHEETS_WARMUP_DELAY = float(os.getenv("SHEETS_WARMUP_DELAY", "2"))
+
+_REFRESHER: Optional[threading.Thread] = None
+_WARMUP: Optional[threading.Thread] = None
+
+
+def refresh_all() -> list:
+  """
+  Refresh the sheet of every active group concurrently.
+
+  Returns a list of (sheet label, snapshot or exception) pairs so callers can
+  report each sheet separately.
+  """
+  return [
+    (f"{group.name} ({group.doc_name}/{group.sheet_name})", result)
+    for group, result in refresh_groups(get_groups())
+  ]
+
+
+def run_forever(interval: int = SHEETS_REFRESH_INTERVAL, stop: Optional[threading.Event] = None) -> None:
+  """Refresh snapshots every ``interval`` seconds until ``stop`` is set."""
+  stop = stop or threading.Event()
+  try:
+    while not stop.is_set():
+      # Long-lived loop outside the request cycle: drop dead DB connections
+      close_old_connections()
+      try:
+        # Renew the Google token here, ahead of expiry, so neither the pulls
+        # below nor any request has to wait for it
+        refresh_token_if_expiring()
+      except Exception as e:
+        logger.warning("Google token refresh failed: %s", e)
+      for label, result in refresh_all():
+        if isinstance(result, Exception):
+          logger.warning("Snapshot refresh failed for %s: %s", label, result)
+      stop.wait(interval)
+  finally:
+    # The loop may run on its own thread; don't leak its connection once stopped
+    connections.close_all()
+
+
+def start_refresher(interval: int = SHEETS_REFRESH_INTERVAL) -> threading.Thread:
+  """Start the background refresher thread once per process."""
+  global _REFRESHER
+  if _REFRESHER is None or not _REFRESHER.is_alive():
+    # Small delay so the first pull doesn't compete with app startup
+    def _target():
+      time.sleep(5)
+      run_forever(interval)
+
+    _REFRESHER = threading.Thread(target=_target, name="sheet-refresher", daemon=True)
+    _REFRESHER.start()
+  return _REFRESHER
+
+
+def warm_up() -> None:
+  """
+  Do the work the first dashboard request would otherwise pay for: import
+  the URLconf (and with it the views), load every group's latest snapshot
+  into the shared cache and build its typed rows. A group without a
+  snapshot yet gets one fetched from Google.
+  """
+  from django.urls import get_resolver
+
+  started = time.monotonic()
+  try:
+    get_resolver().url_patterns
+    for group in get_groups():
+      get_snapshot_data(group.doc_name, group.sheet_name, DAILY_LOG_HEADERS)
+      snapshot = get_snapshot(group.doc_name, group.sheet_name)
+      if snapshot is not None:
+        warm_rows(snapshot)
+  except Exception as e:
+    logger.warning("Warm-up failed: %s", e)
+  else:
+    logger.info("Warm-up finished in %.2fs", time.monotonic() - started)
+  finally:
+    # One-shot thread: close its DB connection instead of leaving it open for CONN_MAX_AGE
+    connections.close_all()
+
+
+def start_warmup(delay: float = SHEETS_WARMUP_DELAY) -> threading.Thread:
+  """Run warm_up() once per process on a background thread."""
+  global _WARMUP
+  if _WARMUP is None:
+    def _target():
+      time.sleep(delay)
+      warm_up()
+
+    _WARMUP = threading.Thread(target=_target, name="sheet-warmup", daemon=True)
+    _WARMUP.start()
+  return _WARMUP
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+from collections import Counter
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ReminderLog, ReminderLogRollup
+
+# Raw ReminderLog rows older than this many days are rolled up into daily
+# per-member counts and removed.
+REMINDER_LOG_RETENTION_DAYS = int(os.getenv("REMINDER_LOG_RETENTION_DAYS", "90"))
+# Rows handled per transaction, so no run holds locks for long.
+REMINDER_LOG_ROLLUP_BATCH_SIZE = int(os.getenv("REMINDER_LOG_ROLLUP_BATCH_SIZE", "1000"))
+# When set, removed rows are appended to gzipped JSON-lines files here
+# (one file per day) instead of only being deleted.
+REMINDER_LOG_ARCHIVE_DIR = os.getenv("REMINDER_LOG_ARCHIVE_DIR", "")
+
+ARCHIVE_FIELDS = ('id', 'member_name', 'sent_at', 'status', 'error_message', 'balance_shown', 'attempts', 'run_id')
+
+
+def retention_cutoff(days: int = REMINDER_LOG_RETENTION_DAYS) -> datetime:
+  """Start of the oldest day whose raw logs are kept."""
+  return timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=days), time.min))
+
+
+def rollup_batch(cutoff: datetime, batch_size: int = REMINDER_LOG_ROLLUP_BATCH_SIZE, archive_dir: Optional[str] = None) -> int:
+  """
+  Roll up and remove one batch of the oldest logs before ``cutoff``.
+
+  The counts are added to the rollups and the rows deleted in the same
+  short transaction, so an interrupted run never counts a row twice.
+  Returns the number of rows removed (0 when nothing is left).
+  """
+  with transaction.atomic():
+    rows = list(
+      ReminderLog.objects.filter(sent_at__lt=cutoff)
+      .order_by('sent_at', 'id')
+      .values(*ARCHIVE_FIELDS)[:batch_size]
+    )
+    if not rows:
+      return 0
+
+    counts = Counter((timezone.localdate(row['sent_at']), row['member_name'], row['status']) for row in rows)
+    for (day, member, status), count in counts.items():
+      if status not in ('success', 'failed'):
+        continue
+      rollup, _ = ReminderLogRollup.objects.get_or_create(day=day, member_name=member)
+      ReminderLogRollup.objects.filter(pk=rollup.pk).update(**{status: F(status) + count})
+
+    if archive_dir:
+      _archive(rows, archive_dir)
+    ReminderLog.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+  return len(rows)
+
+
+def rollup_logs(
+  days: int = REMINDER_LOG_RETENTION_DAYS,
+  batch_size: int = REMINDER_LOG_ROLLUP_BATCH_SIZE,
+  archive_dir: Optional[str] = REMINDER_LOG_ARCHIVE_DIR,
+) -> int:
+  """Roll up every log older than the retention window; returns rows removed."""
+  cutoff = retention_cutoff(days)
+  total = 0
+  while True:
+    removed = rollup_batch(cutoff, batch_size, archive_dir or None)
+    if not removed:
+      return total
+    total += removed
+
+
+def _archive(rows: list, archive_dir: str) -> None:
+  by_day = {}
+  for row in rows:
+    by_day.setdefault(timezone.localdate(row['sent_at']), []).append(row)
+  directory = Path(archive_dir)
+  directory.mkdir(parents=True, exist_ok=True)
+  for day, day_rows in by_day.items():
+    with gzip.open(directory / f"reminder-logs-{day.isoformat()}.jsonl.gz", 'at', encoding='utf-8') as f:
+      for row in day_rows:
+        f.write(json.dumps({**row, 'sent_at': row['sent_at'].isoformat()}) + '\n')
@@ -0,0 +1,225 @@
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .cache import get_sheet_cache
+from .cells import cell_text, parse_amount, parse_date
+from .schema import schema_for
+
+
+class Sign(Enum):
+  """Sign of a parsed cell amount; NONE for blanks, '-' and notes."""
+
+  POSITIVE = 'positive'
+  NEGATIVE = 'negative'
+  ZERO = 'zero'
+  NONE = 'none'
+
+
+def _sign(amount: Optional[Decimal]) -> Sign:
+  if amount is None:
+    return Sign.NONE
+  if amount > 0:
+    return Sign.POSITIVE
+  if amount < 0:
+    return Sign.NEGATIVE
+  return Sign.ZERO
+
+
+class Cell:
+  """
+  One parsed contribution or balance cell.
+
+  ``text`` is the sheet value as written, ``amount`` its Decimal value (None
+  when not numeric), ``display`` what the table shows and ``css`` the
+  classes the table colours it with. Cells are immutable and shared between
+  rows with the same value.
+  """
+
+  __slots__ = ('text', 'amount', 'sign', 'display', 'css')
+
+  def __init__(self, text: str, amount: Optional[Decimal], sign: Sign, display: str, css: str):
+    self.text = text
+    self.amount = amount
+    self.sign = sign
+    self.display = display
+    self.css = css
+
+  def __repr__(self):
+    return f"Cell({self.text!r}, {self.sign.name})"
+
+  @classmethod
+  def contribution(cls, text: str) -> 'Cell':
+    """A day's contribution: '+N' paid, '-' missed, blank, or a note."""
+    amount = parse_amount(text) if text and text != '-' else None
+    sign = _sign(amount)
+    if text == '-' or sign is Sign.NEGATIVE:
+      css = 'text-danger'
+    elif sign is Sign.POSITIVE:
+      css = 'text-success'
+    else:
+      css = ''
+    return cls(text, amount, sign, text or '-', css)
+
+  @classmethod
+  def balance(cls, text: str) -> 'Cell':
+    """A running balance; negative balances are a deficit."""
+    amount = parse_amount(text) if text else None
+    sign = _sign(amount)
+    css = 'text-danger fw-bold' if sign is Sign.NEGATIVE else 'text-success'
+    return cls(text, amount, sign, text or '0', css)
+
+
+class ContributionRow:
+  """One day of the sheet with every cell already parsed."""
+
+  __slots__ = ('position', 'date', 'date_text', 'contributions', 'balances', 'other')
+
+  def __init__(
+    self,
+    position: int,
+    date: Optional[date],
+    date_text: str,
+    contributions: Tuple[Cell, ...],
+    balances: Tuple[Cell, ...],
+    other: Tuple[str, ...],
+  ):
+    self.position = position
+    self.date = date
+    self.date_text = date_text
+    self.contributions = contributions
+    self.balances = balances
+    self.other = other
+
+
+def build_rows(
+  rows: List[dict],
+  members: Dict[str, str],
+  date_column: str = 'Date',
+  other_columns: List[str] = (),
+) -> List[ContributionRow]:
+  """
+  Parse raw sheet rows into ContributionRows with cells in ``members``
+  order. Repeated values ('-', '+50', ...) share one Cell and repeated dates
+  are parsed once, so a long sheet costs little more than its distinct
+  values.
+  """
+  contribution_cells: Dict[str, Cell] = {}
+  balance_cells: Dict[str, Cell] = {}
+
+  def contribution(value) -> Cell:
+    text = cell_text(value)
+    cell = contribution_cells.get(text)
+    if cell is None:
+      cell = contribution_cells[text] = Cell.contribution(text)
+    return cell
+
+  def balance(value) -> Cell:
+    text = cell_text(value)
+    cell = balance_cells.get(text)
+    if cell is None:
+      cell = balance_cells[text] = Cell.balance(text)
+    return cell
+
+  dates: Dict[str, Optional[date]] = {'': None}
+
+  typed = []
+  for position, row in enumerate(rows):
+    date_text = cell_text(row.get(date_column))
+    if date_text not in dates:
+      dates[date_text] = parse_date(date_text)
+    typed.append(ContributionRow(
+      position,
+      dates[date_text],
+      date_text,
+      tuple(contribution(row.get(member)) for member in members),
+      tuple(balance(row.get(running)) for running in members.values()),
+      tuple(cell_text(row.get(column)) for column in other_columns),
+    ))
+  return typed
+
+
+def filter_rows(
+  rows: List[ContributionRow],
+  date_from: Optional[date] = None,
+  date_to: Optional[date] = None,
+) -> List[ContributionRow]:
+  """Rows dated within [date_from, date_to]; undated rows only match no filter."""
+  if date_from is None and date_to is None:
+    return rows
+  return [
+    row for row in rows
+    if row.date is not None
+    and (date_from is None or row.date >= date_from)
+    and (date_to is None or row.date <= date_to)
+  ]
+
+
+class NewestFirst(Sequence):
+  """Read-only reversed view of a row list, so paging newest-first copies nothing."""
+
+  __slots__ = ('rows',)
+
+  def __init__(self, rows: List[ContributionRow]):
+    self.rows = rows
+
+  def __len__(self):
+    return len(self.rows)
+
+  def __getitem__(self, index):
+    size = len(self.rows)
+    if isinstance(index, slice):
+      return [self.rows[size - 1 - i] for i in range(*index.indices(size))]
+    if index < 0:
+      index += size
+    if not 0 <= index < size:
+      raise IndexError(index)
+    return self.rows[size - 1 - index]
+
+
+def sheet_rows(
+  doc_name: str,
+  sheet_name: str,
+  version: int,
+  rows: List[dict],
+  members: Dict[str, str],
+  date_column: str = 'Date',
+  other_columns: List[str] = (),
+) -> List[ContributionRow]:
+  """
+  build_rows() memoised per snapshot version in the shared sheet cache,
+  next to the raw rows, so requests never parse cells.
+  """
+  cache = get_sheet_cache()
+  cache_key = cache.make_key(
+    "typed-rows", doc_name, sheet_name or '', version, tuple(members.items()), date_column, tuple(other_columns)
+  )
+  entry = cache.get_entry(cache_key)
+  if entry is not None:
+    return entry["rows"]
+  typed = build_rows(rows, members, date_column, other_columns)
+  if version:
+    cache.set_rows(cache_key, typed)
+  return typed
+
+
+def warm_rows(snapshot) -> None:
+  """
+  Build the typed rows of a new snapshot for every group that shows it,
+  with the members each group's pages use, so the views find them under
+  the same cache key.
+  """
+  from .groups import get_groups, group_members
+
+  schema = schema_for(snapshot.doc_name, snapshot.sheet_name, snapshot.version, snapshot.rows)
+  member_sets = {
+    tuple(group_members(group, schema).items())
+    for group in get_groups()
+    if (group.doc_name, group.sheet_name or '') == (snapshot.doc_name, snapshot.sheet_name or '')
+  }
+  for members in member_sets:
+    sheet_rows(
+      snapshot.doc_name, snapshot.sheet_name, snapshot.version, snapshot.rows,
+      dict(members), schema.date_column or 'Date', schema.other_columns,
+    )
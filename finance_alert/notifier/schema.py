@@ -0,0 +1,80 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+RUNNING_SUFFIX = ' running'
+
+
+class SheetSchema:
+  """
+  Column layout of a contribution sheet, detected from its header row.
+
+  A member is any column that has a matching "<name> running" balance
+  column (matched case-insensitively, so 'Blessing' pairs with 'blessing
+  running'). ``members`` maps each member's contribution header to its
+  running balance header, exactly as spelled in the sheet.
+  """
+
+  __slots__ = ('headers', 'date_column', 'members', 'other_columns')
+
+  def __init__(self, headers: List[str]):
+    self.headers = [str(h).strip() for h in headers]
+    # Blank headers dropped; first occurrence wins, like gspread's
+    # expected_headers handling
+    named = list(dict.fromkeys(header for header in self.headers if header))
+
+    lowered = {header.lower(): header for header in named}
+    self.date_column: Optional[str] = lowered.get('date')
+
+    self.members: Dict[str, str] = {}
+    running_columns = set()
+    for header in named:
+      running = lowered.get(header.lower() + RUNNING_SUFFIX)
+      if running and not header.lower().endswith(RUNNING_SUFFIX):
+        self.members[header] = running
+        running_columns.add(running)
+
+    self.other_columns = [
+      header for header in named
+      if header != self.date_column and header not in self.members and header not in running_columns
+    ]
+
+  def find_member(self, name: str) -> Optional[str]:
+    """The member header matching ``name`` case-insensitively, if any."""
+    name = name.strip().lower()
+    for member in self.members:
+      if member.lower() == name:
+        return member
+    return None
+
+
+# Resolved schemas per (doc_name, sheet_name); only the latest version of
+# each sheet is kept.
+_SCHEMAS: Dict[Tuple[str, str], Tuple[int, SheetSchema]] = {}
+
+
+def resolve_schema(headers: List[str]) -> SheetSchema:
+  return SheetSchema(headers)
+
+
+def schema_for(doc_name: str, sheet_name: str, version: int, rows: List[dict]) -> SheetSchema:
+  """
+  Schema for a snapshot version, resolved from its header row once and
+  reused for every request until the version changes.
+  """
+  key = (doc_name, sheet_name or '')
+  cached = _SCHEMAS.get(key)
+  if cached and cached[0] == version and version:
+    return cached[1]
+  schema = resolve_schema(list(rows[0].keys()) if rows else [])
+  _SCHEMAS[key] = (version, schema)
+  return schema
+
+
+def member_email(member: str) -> str:
+  """
+  Reminder address for a member: the <NAME>_EMAIL environment variable
+  (e.g. SULTAN_EMAIL), falling back to <name>@example.com.
+  """
+  env_name = re.sub(r'[^A-Z0-9]+', '_', member.upper()).strip('_')
+  return os.getenv(f'{env_name}_EMAIL', f'{member.lower()}@example.com')
@@ -1,17 +1,59 @@
 import os
 import json
-import gspread
 import time
-from typing import List, Tuple, Optional
+import hashlib
+import logging
+import threading
+from datetime import timezone as dt_timezone
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .breaker import SHEETS_CALL_BUDGET, get_sheets_breaker
+from .cache import get_sheet_cache
+from .rows import warm_rows
+from .models import SheetSnapshot
+from .fetch import SHEETS_FETCH_WORKERS
+from .metrics import SHEETS_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+  import gspread
+
+# gspread (and google-auth / requests under it) is imported on first use
+# rather than here: it is a large part of process start-up, and most
+# requests are served from stored snapshots without ever calling Google.
 
 # Lazy client so we don't import Django settings at module import time and avoid
 # circular imports between settings.py and this module.
-_GSPREAD_CLIENT: Optional[gspread.client.Client] = None
+_GSPREAD_CLIENT: Optional["gspread.Client"] = None
+
+# The worksheet behind the dashboard and the daily reminders. Members are
+# detected from the header row (see notifier.schema); expected headers are
+# only needed because the sheet has duplicate (blank) column names.
+DAILY_LOG_DOC = "money mates tracker"
+DAILY_LOG_SHEET = "daily log"
+DAILY_LOG_HEADERS = ['Date']
 
-# Simple in-process cache for sheet data to avoid expensive calls on every
-# request (e.g., Render health checks). TTL can be tuned via env.
-_CACHE: dict[Tuple[str, Optional[str], Tuple[str, ...]], tuple[float, list[dict]]] = {}
-_CACHE_TTL_SECONDS = int(os.getenv("SHEETS_CACHE_TTL", "300"))  # default 5 minutes
+# How many old snapshot versions to keep per sheet.
+SHEETS_SNAPSHOT_KEEP = int(os.getenv("SHEETS_SNAPSHOT_KEEP", "5"))
+# Incremental sync: re-read this many of the most recent stored rows on each
+# refresh, and do a full re-download at least this often to pick up edits to
+# older rows.
+SHEETS_SYNC_OVERLAP_ROWS = int(os.getenv("SHEETS_SYNC_OVERLAP_ROWS", "3"))
+SHEETS_FULL_RESYNC_SECONDS = int(os.getenv("SHEETS_FULL_RESYNC_SECONDS", str(6 * 3600)))
+# Resolved spreadsheet keys are remembered this long, so reads open the
+# spreadsheet by key instead of searching Drive by name.
+SHEETS_LOCATION_TTL = int(os.getenv("SHEETS_LOCATION_TTL", "86400"))
+# Refresh the service-account access token once it has less than this many
+# seconds left, from the background refresher rather than a request.
+SHEETS_TOKEN_REFRESH_MARGIN = int(os.getenv("SHEETS_TOKEN_REFRESH_MARGIN", "900"))
+
+# Sheet data is cached through notifier.cache (Django's cache framework) to
+# avoid expensive calls on every request (e.g., Render health checks) and to
+# share one copy of the rows between workers. TTLs are tuned via env there.
 
 def _build_credentials_dict() -> dict:
   """
@@ -40,13 +82,15 @@ def _build_credentials_dict() -> dict:
   # Remove keys that are None to avoid confusing the client
   return {k: v for k, v in creds.items() if v is not None}
 
-def _get_gspread_client() -> gspread.client.Client:
+def _get_gspread_client() -> "gspread.Client":
   """
   Return a cached gspread client, creating it from environment credentials
   if necessary.
   """
   global _GSPREAD_CLIENT
   if _GSPREAD_CLIENT is None:
+    import gspread
+
     creds = _build_credentials_dict()
     if not creds.get('private_key') or not creds.get('client_email'):
       raise RuntimeError(
@@ -55,47 +99,415 @@ def _get_gspread_client() -> gspread.client.Client:
       )
     # gspread provides a helper that accepts a dict with service account
     # credentials.
-    _GSPREAD_CLIENT = gspread.service_account_from_dict(creds)
+    client = gspread.service_account_from_dict(creds)
+    # gspread has no timeout by default; never let one HTTP call outlive
+    # the per-call budget enforced by the circuit breaker
+    client.http_client.set_timeout(SHEETS_CALL_BUDGET)
+    # The authorized session keeps connections alive; size its pool so
+    # concurrent group refreshes (notifier.fetch) each reuse one.
+    from requests.adapters import HTTPAdapter
+    client.http_client.session.mount("https://", HTTPAdapter(pool_maxsize=max(10, SHEETS_FETCH_WORKERS)))
+    _GSPREAD_CLIENT = client
   return _GSPREAD_CLIENT
 
 
-def get_all_rows(doc_name: str, sheet_name: str = None, expected_headers: List[str] = None) -> List[dict]:
+def refresh_token_if_expiring(margin: int = SHEETS_TOKEN_REFRESH_MARGIN) -> bool:
+  """
+  Fetch a new access token when the current one expires within ``margin``
+  seconds (or there is none yet), so Sheets calls never stop to refresh it
+  inline. Called from the background refresher; returns True if refreshed.
+  """
+  client = _get_gspread_client()
+  credentials = getattr(getattr(client, "http_client", None), "auth", None)
+  if credentials is None:
+    return False  # fake or externally built client
+  # google-auth keeps the expiry as a naive UTC datetime
+  expiry = getattr(credentials, "expiry", None)
+  if credentials.token and expiry and expiry.replace(tzinfo=dt_timezone.utc).timestamp() - time.time() > margin:
+    return False
+  from google.auth.transport.requests import Request
+
+  # A plain transport: going through the authorized session would try to
+  # authorize the token request itself
+  credentials.refresh(Request())
+  logger.info("Refreshed Google Sheets access token (expires %s)", credentials.expiry)
+  return True
+
+
+def set_gspread_client(client) -> None:
+  """
+  Replace the process-wide gspread client, e.g. with a fake in tests. Pass
+  None to go back to building one from environment credentials.
+  """
+  global _GSPREAD_CLIENT
+  _GSPREAD_CLIENT = client
+
+
+def _location_key(doc_name: str, sheet_name: Optional[str]) -> str:
+  return get_sheet_cache().make_key("location", doc_name, sheet_name or '')
+
+
+def _locate(client: "gspread.Client", doc_name: str, sheet_name: Optional[str]) -> Tuple[dict, bool]:
+  """
+  ``({"key", "title"}, from_cache)`` for a worksheet: its spreadsheet key
+  and its tab title (the first tab's when ``sheet_name`` is empty).
+
+  Resolving a name costs a Drive search plus metadata reads, so the result
+  is kept in the shared cache; with it a read is a single values request.
+  """
+  backend = get_sheet_cache().backend
+  location = backend.get(_location_key(doc_name, sheet_name))
+  if location is not None:
+    return location, True
+
+  sh = client.open(doc_name)
+  # Correct use of the worksheet accessor (it's a method, not subscriptable)
+  worksheet = sh.worksheet(sheet_name) if sheet_name else sh.get_worksheet(0)
+  location = {"key": sh.id, "title": worksheet.title}
+  backend.set(_location_key(doc_name, sheet_name), location, timeout=SHEETS_LOCATION_TTL)
+  return location, False
+
+
+def _read_worksheet(doc_name: str, sheet_name: Optional[str], read):
+  """
+  ``read(http_client, key, title)`` for the named worksheet, where ``key``
+  is the spreadsheet key and ``title`` the tab title to build ranges from.
+  If a remembered location has gone stale (spreadsheet deleted or tab
+  renamed, so Google answers 400/404), it is forgotten and the read
+  retried once after resolving the name again.
+  """
+  import gspread
+
+  client = _get_gspread_client()
+  location, from_cache = _locate(client, doc_name, sheet_name)
+  try:
+    return read(client.http_client, location["key"], location["title"])
+  except gspread.exceptions.APIError as e:
+    if not from_cache or e.response.status_code not in (400, 404):
+      raise
+    get_sheet_cache().backend.delete(_location_key(doc_name, sheet_name))
+    location, _ = _locate(client, doc_name, sheet_name)
+    return read(client.http_client, location["key"], location["title"])
+
+
+def _to_records(headers: List[str], values: List[list], expected_headers: Optional[List[str]]) -> List[dict]:
+  """
+  Turn raw cell values into row dicts the same way get_all_records() does:
+  validate the header row, pad short rows and numericise cell values.
+  """
+  import gspread
+
+  if expected_headers:
+    # If expected headers provided, use them to handle duplicates
+    missing = set(expected_headers) - set(headers)
+    if len(expected_headers) != len(set(expected_headers)) or missing:
+      raise gspread.exceptions.GSpreadException(
+        f"the given 'expected_headers' are not unique or contain unknown headers: {missing}"
+      )
+  elif len(headers) != len(set(headers)):
+    raise gspread.exceptions.GSpreadException("the header row in the worksheet is not unique")
+
+  width = len(headers)
+  padded = [list(row) + [''] * (width - len(row)) for row in values]
+  return gspread.utils.to_records(headers, [gspread.utils.numericise_all(row) for row in padded])
+
+
+def _fetch_rows(doc_name: str, sheet_name: Optional[str], expected_headers: Optional[List[str]]) -> List[dict]:
+  """Read a whole worksheet straight from Google Sheets, bypassing the cache."""
+  return _fetch_sheet(doc_name, sheet_name, expected_headers)[1]
+
+
+def _fetch_sheet(doc_name: str, sheet_name: Optional[str], expected_headers: Optional[List[str]]) -> Tuple[List[str], List[dict]]:
+  """Read a whole worksheet and return (header row, row dicts)."""
+  import gspread
+
+  response = _read_worksheet(
+    doc_name, sheet_name,
+    lambda http_client, key, title: http_client.values_get(key, gspread.utils.absolute_range_name(title)),
+  )
+  # Pad to the widest row, like worksheet.get(pad_values=True)
+  values = gspread.utils.fill_gaps(response.get("values") or [[]])
+  if not values or values == [[]]:
+    return [], []
+  headers = [str(h) for h in values[0]]
+  return headers, _to_records(headers, values[1:], expected_headers)
+
+
+def _fetch_tail(
+  doc_name: str,
+  sheet_name: Optional[str],
+  expected_headers: Optional[List[str]],
+  headers: List[str],
+  rows: List[dict],
+) -> Optional[List[dict]]:
+  """
+  Incrementally sync a worksheet whose header row and first ``len(rows)``
+  data rows were stored earlier.
+
+  Reads the header row plus the range from the last few stored rows to the
+  end of the sheet in one batch request, and splices that tail onto the
+  stored rows. The overlap catches edits to recent rows (today's entry is
+  often corrected). Returns None when the header layout changed and a full
+  read is needed instead.
+  """
+  import gspread
+
+  # Sheet row numbers are 1-based and row 1 is the header, so stored row i
+  # lives on sheet row i + 2.
+  keep = max(0, len(rows) - SHEETS_SYNC_OVERLAP_ROWS)
+  last_col = gspread.utils.rowcol_to_a1(1, len(headers)).rstrip('0123456789')
+
+  def read(http_client, key, title):
+    response = http_client.values_batch_get(key, [
+      gspread.utils.absolute_range_name(title, "1:1"),
+      gspread.utils.absolute_range_name(title, f"A{keep + 2}:{last_col}"),
+    ])
+    return [value_range.get("values") or [] for value_range in response.get("valueRanges", [])]
+
+  header_range, tail = _read_worksheet(doc_name, sheet_name, read)
+  current_headers = [str(h) for h in header_range[0]] if header_range else []
+  # The stored header row was padded to the widest data row; this one isn't
+  if _trim(current_headers) != _trim(headers):
+    return None
+  return rows[:keep] + _to_records(headers, tail, expected_headers)
+
+
+def _trim(headers: List[str]) -> List[str]:
+  """``headers`` without trailing blank columns."""
+  headers = list(headers)
+  while headers and headers[-1] == '':
+    headers.pop()
+  return headers
+
+
+def _rows_key(doc_name: str, sheet_name: Optional[str], expected_headers: Optional[Sequence[str]]) -> str:
+  return get_sheet_cache().make_key(doc_name, sheet_name, tuple(expected_headers) if expected_headers else tuple())
+
+
+def get_all_rows(doc_name: str, sheet_name: str = None, expected_headers: List[str] = None, ttl: Optional[int] = None) -> List[dict]:
   """
   Fetches all rows from a given Google Sheet worksheet and returns a list
   of dictionaries using the first row as headers.
-  
+
+  Rows are served from the shared sheet cache; stale rows are returned while
+  a single worker refreshes them in the background.
+
   Args:
     doc_name: Name of the Google Sheet document
     sheet_name: Name of the worksheet tab (optional, defaults to first sheet)
     expected_headers: List of expected column headers to handle duplicates (optional)
+    ttl: Seconds the rows stay fresh for this sheet (optional, defaults to SHEETS_CACHE_TTL)
   """
-  # Check cache first
-  cache_key = (doc_name, sheet_name, tuple(expected_headers) if expected_headers else tuple())
-  now = time.time()
-  cached = _CACHE.get(cache_key)
-  if cached and (now - cached[0]) < _CACHE_TTL_SECONDS:
-    return cached[1]
-
+  cache = get_sheet_cache()
+  cache_key = _rows_key(doc_name, sheet_name, expected_headers)
   try:
-    client = _get_gspread_client()
-    sh = client.open(doc_name)
-    if sheet_name:
-      # Correct use of the worksheet accessor (it's a method, not subscriptable)
-      worksheet = sh.worksheet(sheet_name)
-    else:
-      worksheet = sh.get_worksheet(0)
-
-    # If expected headers provided, use them to handle duplicates
-    rows = (
-      worksheet.get_all_records(expected_headers=expected_headers)
-      if expected_headers else
-      worksheet.get_all_records()
+    return cache.get_or_refresh(
+      cache_key,
+      lambda: get_sheets_breaker().call(_fetch_rows, doc_name, sheet_name, expected_headers),
+      ttl=ttl,
     )
-    # Update cache on success
-    _CACHE[cache_key] = (now, rows)
-    return rows
   except Exception:
-    # On failure, serve stale cache if available; otherwise, return empty list
-    if cached:
-      return cached[1]
-    return []
\ No newline at end of file
+    # Nothing cached and the fetch failed; return empty list
+    SHEETS_CACHE_REQUESTS.inc(result="error")
+    return []
+
+
+def _content_hash(rows: List[dict]) -> str:
+  payload = json.dumps(rows, sort_keys=True, default=str).encode("utf-8")
+  return hashlib.sha256(payload).hexdigest()
+
+
+def get_snapshot(doc_name: str, sheet_name: str = None) -> Optional[SheetSnapshot]:
+  """Return the latest stored snapshot for a worksheet, or None."""
+  return (
+    SheetSnapshot.objects
+    .filter(doc_name=doc_name, sheet_name=sheet_name or '')
+    .order_by('-version')
+    .first()
+  )
+
+
+def refresh_snapshot(
+  doc_name: str,
+  sheet_name: str = None,
+  expected_headers: List[str] = None,
+  full: Optional[bool] = None,
+) -> SheetSnapshot:
+  """
+  Fetch a worksheet from Google and store it as the latest snapshot.
+
+  By default only the tail of the sheet is read (see _fetch_tail); a full
+  re-download happens when there is no usable snapshot, the header layout
+  changed, SHEETS_FULL_RESYNC_SECONDS have passed since the last full read,
+  or ``full=True`` is passed.
+
+  A new version is written only when the content hash changes; otherwise the
+  existing snapshot is just marked as checked. Raises on fetch errors so
+  the caller (refresher loop, management command) can decide how to report
+  them.
+
+  Google calls go through the sheets circuit breaker: each is cut off after
+  SHEETS_CALL_BUDGET seconds, and while Google keeps failing this raises
+  CircuitOpenError at once, so callers fall back to the last stored
+  snapshot without waiting.
+  """
+  now = timezone.now()
+  latest = get_snapshot(doc_name, sheet_name)
+  breaker = get_sheets_breaker()
+
+  rows = None
+  if full is not True and latest and latest.headers and latest.full_synced_at:
+    due = (now - latest.full_synced_at).total_seconds() >= SHEETS_FULL_RESYNC_SECONDS
+    if not due:
+      rows = breaker.call(_fetch_tail, doc_name, sheet_name, expected_headers, latest.headers, latest.rows)
+
+  if rows is None:
+    headers, rows = breaker.call(_fetch_sheet, doc_name, sheet_name, expected_headers)
+    full_synced_at = now
+  else:
+    headers, full_synced_at = latest.headers, latest.full_synced_at
+  content_hash = _content_hash(rows)
+
+  with transaction.atomic():
+    latest = get_snapshot(doc_name, sheet_name)
+    if latest and latest.content_hash == content_hash:
+      latest.checked_at = now
+      latest.full_synced_at = full_synced_at
+      latest.headers = headers
+      latest.save(update_fields=['checked_at', 'full_synced_at', 'headers'])
+      return latest
+
+    snapshot = SheetSnapshot.objects.create(
+      doc_name=doc_name,
+      sheet_name=sheet_name or '',
+      version=(latest.version + 1) if latest else 1,
+      content_hash=content_hash,
+      headers=headers,
+      rows=rows,
+      row_count=len(rows),
+      checked_at=now,
+      full_synced_at=full_synced_at,
+    )
+    # Prune old versions so the table doesn't grow with every edit
+    stale_ids = list(
+      SheetSnapshot.objects
+      .filter(doc_name=doc_name, sheet_name=sheet_name or '')
+      .order_by('-version')
+      .values_list('id', flat=True)[SHEETS_SNAPSHOT_KEEP:]
+    )
+    if stale_ids:
+      SheetSnapshot.objects.filter(id__in=stale_ids).delete()
+    # Parse the new version's cells once, after it is committed; a failure
+    # here only means the first request builds them instead
+    transaction.on_commit(lambda: warm_rows(snapshot), robust=True)
+  return snapshot
+
+
+def get_snapshot_version(doc_name: str, sheet_name: str = None) -> Optional[Tuple[int, str]]:
+  """``(version, content_hash)`` of the latest stored snapshot, or None."""
+  return (
+    SheetSnapshot.objects
+    .filter(doc_name=doc_name, sheet_name=sheet_name or '')
+    .order_by('-version')
+    .values_list('version', 'content_hash')
+    .first()
+  )
+
+
+def _refresh_snapshot_in_background(
+  lease_key: str,
+  doc_name: str,
+  sheet_name: Optional[str],
+  expected_headers: Optional[List[str]],
+) -> None:
+  """Start refresh_snapshot on a thread unless a thread or worker already is."""
+  cache = get_sheet_cache()
+  if cache.flight.in_flight(lease_key):
+    return
+  token = cache.acquire_lock(lease_key)
+  if not token:
+    return
+
+  def _target():
+    try:
+      cache.flight.do(lease_key, lambda: refresh_snapshot(doc_name, sheet_name, expected_headers))
+    except Exception as e:
+      # Keep serving the stored snapshot; the next request past the TTL retries
+      logger.warning("Background snapshot refresh failed for %s/%s: %s", doc_name, sheet_name, e)
+    finally:
+      cache.release_lock(lease_key, token)
+      # The thread ends here; don't leave its DB connection open for CONN_MAX_AGE
+      connections.close_all()
+
+  threading.Thread(target=_target, name="snapshot-refresh", daemon=True).start()
+
+
+def get_snapshot_data(
+  doc_name: str,
+  sheet_name: str = None,
+  expected_headers: List[str] = None,
+) -> Tuple[int, List[dict]]:
+  """
+  Return ``(version, rows)`` of the latest stored snapshot without calling
+  Google. Version 0 with no rows means nothing could be loaded.
+
+  Only the version number is read from the database per call; the rows
+  themselves are cached per version in the shared sheet cache. If no
+  snapshot exists yet (fresh deploy), one is fetched inline once;
+  concurrent callers wait for that fetch instead of making their own. A snapshot last checked
+  more than SHEETS_CACHE_TTL ago is still returned, and one background
+  thread (across all workers) refreshes it, so the data keeps up with the
+  sheet even without the refresher thread.
+  """
+  cache = get_sheet_cache()
+  lease_key = cache.make_key("snapshot-refresh", doc_name, sheet_name or '')
+  latest = (
+    SheetSnapshot.objects
+    .filter(doc_name=doc_name, sheet_name=sheet_name or '')
+    .order_by('-version')
+    .values_list('version', 'checked_at')
+    .first()
+  )
+  version = latest[0] if latest else None
+  if version is None:
+    # Concurrent first requests (threads and workers) share one fetch
+    try:
+      snapshot = cache.flight.do(lease_key, lambda: cache.lease(
+        lease_key,
+        lambda: get_snapshot(doc_name, sheet_name),
+        lambda: refresh_snapshot(doc_name, sheet_name, expected_headers),
+      ))
+      return snapshot.version, snapshot.rows
+    except Exception:
+      SHEETS_CACHE_REQUESTS.inc(result="error")
+      return 0, []
+
+  checked_at = latest[1]
+  if checked_at is None or (timezone.now() - checked_at).total_seconds() >= cache.ttl:
+    _refresh_snapshot_in_background(lease_key, doc_name, sheet_name, expected_headers)
+
+  cache_key = cache.make_key("snapshot", doc_name, sheet_name or '', version)
+  entry = cache.get_entry(cache_key)
+  if entry is not None:
+    SHEETS_CACHE_REQUESTS.inc(result="hit")
+    return version, entry["rows"]
+
+  SHEETS_CACHE_REQUESTS.inc(result="miss")
+  rows = (
+    SheetSnapshot.objects
+    .filter(doc_name=doc_name, sheet_name=sheet_name or '', version=version)
+    .values_list('rows', flat=True)
+    .first()
+  ) or []
+  # Versions are immutable, so the entry only needs to outlive the TTL window
+  cache.set_rows(cache_key, rows)
+  return version, rows
+
+
+def get_snapshot_rows(
+  doc_name: str,
+  sheet_name: str = None,
+  expected_headers: List[str] = None,
+) -> List[dict]:
+  """Return the rows of the latest stored snapshot (see get_snapshot_data)."""
+  return get_snapshot_data(doc_name, sheet_name, expected_headers)[1]
@@ -0,0 +1,123 @@
+from array import array
+from typing import Dict, List
+
+from .cache import get_sheet_cache
+from .cells import parse_date
+
+
+def _column_text(rows: List[dict], key: str) -> List[str]:
+  """One sheet column as trimmed text ('' for blanks)."""
+  return [
+    '' if value is None or value == '' else str(value).strip()
+    for value in [row.get(key) for row in rows]
+  ]
+
+
+def _amount(text: str) -> float:
+  """Contribution cell as a number; 0.0 for '-', blanks and non-numeric notes."""
+  if not text or text == '-':
+    return 0.0
+  try:
+    return float(text.replace('+', '').replace(',', ''))
+  except ValueError:
+    return 0.0
+
+
+class MemberColumns:
+  """
+  One member's history as compact parallel columns.
+
+  ``amounts`` holds the parsed contribution per row (0.0 when nothing was
+  paid) and the byte flags mark which rows have a contribution, any
+  contribution text, or a balance, so totals, counts and "latest" lookups
+  are C-level reductions (``sum``, ``count``, ``rfind``) instead of Python
+  loops over the rows.
+  """
+
+  __slots__ = ('amounts', 'contributed', 'has_amount_text', 'has_balance', 'amount_text', 'balance_text')
+
+  def __init__(self, amount_text: List[str], balance_text: List[str]):
+    self.amount_text = amount_text
+    self.balance_text = balance_text
+    self.amounts = array('d', map(_amount, amount_text))
+    self.has_amount_text = bytearray(map(bool, amount_text))
+    self.contributed = bytearray([text != '' and text != '-' for text in amount_text])
+    self.has_balance = bytearray(map(bool, balance_text))
+
+
+class SheetColumns:
+  """
+  Daily log rows parsed once into per-member columns.
+
+  Build this once per snapshot version; every summary after that only
+  touches the columns.
+  """
+
+  __slots__ = ('size', 'date_text', 'has_date', 'members')
+
+  def __init__(self, rows: List[dict], members: Dict[str, str], date_column: str = 'Date'):
+    self.size = len(rows)
+    self.date_text = _column_text(rows, date_column)
+    self.has_date = bytearray(map(bool, self.date_text))
+    self.members = {
+      member: MemberColumns(_column_text(rows, member), _column_text(rows, running_key))
+      for member, running_key in members.items()
+    }
+
+
+def summarize_columns(columns: SheetColumns) -> Dict[str, dict]:
+  """
+  Every member's totals from pre-parsed columns in a single pass over the
+  members (each member's figures are C-level reductions over its columns).
+
+  Returns ``{member: {'balance', 'deficit', 'total_contributed',
+  'days_contributed', 'last_contribution', 'date'}}`` in the order of the
+  columns. ``date`` is the latest dated row in the sheet, shared by all
+  members.
+  """
+  last_dated = columns.has_date.rfind(1)
+  latest_date = parse_date(columns.date_text[last_dated]) if last_dated >= 0 else None
+
+  summary = {}
+  for member, col in columns.members.items():
+    last_balance = col.has_balance.rfind(1)
+    last_contribution = col.has_amount_text.rfind(1)
+    balance = col.balance_text[last_balance] if last_balance >= 0 else '0'
+    summary[member] = {
+      'balance': balance,
+      'deficit': '-' in balance,
+      'total_contributed': sum(col.amounts),
+      'days_contributed': col.contributed.count(1),
+      'last_contribution': col.amount_text[last_contribution] if last_contribution >= 0 else '-',
+      'date': latest_date,
+    }
+  return summary
+
+
+def summarize_rows(rows: List[dict], members: Dict[str, str], date_column: str = 'Date') -> Dict[str, dict]:
+  """Parse ``rows`` once and summarise every member in a single pass."""
+  return summarize_columns(SheetColumns(rows, members, date_column))
+
+
+def snapshot_summaries(
+  doc_name: str,
+  sheet_name: str,
+  version: int,
+  rows: List[dict],
+  members: Dict[str, str],
+  date_column: str = 'Date',
+) -> Dict[str, dict]:
+  """
+  summarize_rows() memoised per snapshot version in the shared sheet cache,
+  so repeat requests for an unchanged sheet do no parsing at all.
+  """
+  cache = get_sheet_cache()
+  cache_key = cache.make_key("summary", doc_name, sheet_name or '', version, tuple(members.items()), date_column)
+  entry = cache.get_entry(cache_key)
+  if entry is not None:
+    return entry["rows"]
+  summary = summarize_rows(rows, members, date_column)
+  if version:
+    cache.set_rows(cache_key, summary)
+  return summary
+
@@ -1,3 +1,810 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import smtplib
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 
-# Create your tests here.
+from datetime import datetime, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from django.core.mail import EmailMessage
+
+from notifier import aio, delivery, imageproxy, jobs, rows, services, views
+from notifier.breaker import CircuitBreaker, CircuitOpenError, SheetsCallTimeout, is_sheets_outage
+from notifier.delivery import DeliveryResult, send_messages
+from notifier.cache import LeaseHolderFailed, SheetCache
+from notifier.metrics import REGISTRY, SHEETS_CACHE_REQUESTS, Registry
+from notifier.models import Group, ReminderLog, ReminderLogRollup
+from notifier.views import _group_table
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'notifier-tests'}}
+
+
+def run_concurrently(fn, count):
+    """Call ``fn(i)`` from ``count`` threads at once; returns their results or exceptions."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def target(i):
+        barrier.wait()
+        try:
+            results[i] = fn(i)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def cache_requests(result):
+    with REGISTRY.lock:
+        return REGISTRY.values(SHEETS_CACHE_REQUESTS.name).get((('result', result),), 0)
+
+
+@override_settings(CACHES=LOCMEM)
+class SheetCacheConcurrencyTests(SimpleTestCase):
+    def setUp(self):
+        SheetCache().backend.clear()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def loader(self, delay=0.2, fail=False):
+        def load():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(delay)
+            if fail:
+                raise RuntimeError('Google is down')
+            return [{'Date': '1/11/2025'}]
+        return load
+
+    def test_concurrent_misses_in_one_process_load_once(self):
+        cache = SheetCache(lock_timeout=5)
+        results = run_concurrently(lambda i: cache.get_or_refresh('k', self.loader()), 10)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [[{'Date': '1/11/2025'}]] * 10)
+
+    def test_concurrent_misses_across_workers_load_once(self):
+        # Separate SheetCache instances have separate SingleFlights, like workers
+        workers = [SheetCache(lock_timeout=5) for _ in range(6)]
+        results = run_concurrently(lambda i: workers[i].get_or_refresh('k', self.loader()), 6)
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(result == [{'Date': '1/11/2025'}] for result in results))
+
+    def test_waiters_fail_fast_when_the_lease_holder_fails(self):
+        workers = [SheetCache(lock_timeout=30) for _ in range(4)]
+        loader = self.loader(delay=0.3, fail=True)
+        started = time.monotonic()
+        results = run_concurrently(lambda i: workers[i].get_or_refresh('k', loader), 4)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(all(isinstance(result, Exception) for result in results))
+        self.assertTrue(any(isinstance(result, LeaseHolderFailed) for result in results))
+        self.assertLess(self.calls, 4)
+
+
+class FakeHTTPClient:
+    """The values endpoints of gspread.http_client.HTTPClient, over an in-memory grid."""
+
+    def __init__(self, values, title, delay):
+        self.values = values
+        self.title = title
+        self.delay = delay
+        self.requests = []
+
+    def _range(self, name):
+        import gspread
+
+        title, _, a1 = name.partition('!')
+        if title.strip("'") != self.title:
+            response = mock.Mock(status_code=400)
+            response.json.return_value = {'error': {'code': 400, 'message': f'Unable to parse range: {name}'}}
+            raise gspread.exceptions.APIError(response)
+        grid = gspread.utils.a1_range_to_grid_range(a1) if a1 else {}
+        rows = self.values[grid.get('startRowIndex', 0):grid.get('endRowIndex')]
+        rows = [row[grid.get('startColumnIndex', 0):grid.get('endColumnIndex')] for row in rows]
+        # Like Google: no trailing blank cells or rows
+        rows = [row[:max((i + 1 for i, cell in enumerate(row) if cell != ''), default=0)] for row in rows]
+        while rows and not rows[-1]:
+            rows.pop()
+        return {'range': name, 'majorDimension': 'ROWS', 'values': rows}
+
+    def values_get(self, key, range, params=None):
+        self.requests.append(('values_get', key, range))
+        time.sleep(self.delay)
+        return self._range(range)
+
+    def values_batch_get(self, key, ranges, params=None):
+        self.requests.append(('values_batch_get', key, tuple(ranges)))
+        time.sleep(self.delay)
+        return {'spreadsheetId': key, 'valueRanges': [self._range(name) for name in ranges]}
+
+
+class FakeWorksheet:
+    def __init__(self, title):
+        self.title = title
+
+
+class FakeSpreadsheet:
+    id = 'sheet-key'
+
+    def __init__(self, title):
+        self.title = title
+
+    def worksheet(self, name):
+        import gspread
+
+        if name != self.title:
+            raise gspread.exceptions.WorksheetNotFound(name)
+        return FakeWorksheet(name)
+
+    def get_worksheet(self, index):
+        return FakeWorksheet(self.title)
+
+
+class FakeClient:
+    """
+    Stands in for gspread.Client through services.set_gspread_client():
+    open() by name, and the values calls on ``http_client``.
+    """
+
+    def __init__(self, values, delay=0.2, title='log'):
+        self.http_client = FakeHTTPClient(values, title, delay)
+        self.opens = 0
+        self.lock = threading.Lock()
+
+    def open(self, name):
+        with self.lock:
+            self.opens += 1
+        return FakeSpreadsheet(self.http_client.title)
+
+
+@override_settings(CACHES=LOCMEM)
+class ColdSnapshotTests(TransactionTestCase):
+    def setUp(self):
+        SheetCache().backend.clear()
+        self.client = FakeClient([['Date', 'sultan', 'sultan running'], ['1/11/2025', '+50', '50']])
+        services.set_gspread_client(self.client)
+
+    def tearDown(self):
+        services.set_gspread_client(None)
+
+    def test_concurrent_cold_requests_share_one_fetch(self):
+        results = run_concurrently(lambda i: services.get_snapshot_data('doc', 'log', ['Date']), 6)
+        self.assertEqual(self.client.opens, 1)
+        self.assertEqual([version for version, _ in results], [1] * 6)
+        self.assertTrue(all(len(rows) == 1 for _, rows in results))
+
+    def test_snapshot_reads_are_counted(self):
+        hits, misses, errors = cache_requests('hit'), cache_requests('miss'), cache_requests('error')
+        services.get_snapshot_data('doc', 'log', ['Date'])  # cold: fetched, then stored
+        services.get_snapshot_data('doc', 'log', ['Date'])  # rows not cached yet
+        services.get_snapshot_data('doc', 'log', ['Date'])
+        self.assertEqual(cache_requests('miss') - misses, 1)
+        self.assertEqual(cache_requests('hit') - hits, 1)
+
+        self.client.open = lambda name: 1 / 0  # Google is down
+        self.assertEqual(services.get_snapshot_data('other', 'log', ['Date']), (0, []))
+        self.assertEqual(cache_requests('error') - errors, 1)
+
+
+def failing_call():
+    raise ConnectionError('Google is down')
+
+
+@override_settings(CACHES=LOCMEM)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker('test', threshold=2, reset_seconds=0.2, budget=0.5, is_failure=is_sheets_outage)
+        self.breaker.backend.clear()
+
+    def trip(self):
+        with self.assertLogs('notifier.breaker', 'WARNING'):
+            for _ in range(2):
+                with self.assertRaises(ConnectionError):
+                    self.breaker.call(failing_call)
+
+    def test_breaker_opens_then_closes_after_a_successful_trial(self):
+        self.trip()
+        self.assertEqual(self.breaker.status()['state'], 'open')
+        called = mock.Mock()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(called)
+        called.assert_not_called()
+
+        time.sleep(0.25)
+        self.assertEqual(self.breaker.status()['state'], 'half-open')
+        self.assertEqual(self.breaker.call(lambda: 'rows'), 'rows')
+        self.assertEqual(self.breaker.status(), {'state': 'closed', 'failures': 0, 'retry_in': 0, 'last_error': ''})
+
+    def test_half_open_breaker_lets_one_trial_through(self):
+        self.trip()
+        time.sleep(0.25)
+        allowed = run_concurrently(lambda i: self.breaker.allow(), 5)
+        self.assertEqual(sorted(allowed), [False] * 4 + [True])
+
+    def test_failed_trial_reopens_the_breaker(self):
+        self.trip()
+        time.sleep(0.25)
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(failing_call)
+        self.assertEqual(self.breaker.status()['state'], 'open')
+
+    def test_call_over_budget_fails_fast(self):
+        started = time.monotonic()
+        with self.assertRaises(SheetsCallTimeout):
+            self.breaker.call(time.sleep, 2)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.breaker.status()['failures'], 1)
+
+    def test_invalid_header_does_not_count_as_a_failure(self):
+        import gspread
+
+        for _ in range(3):
+            with self.assertRaises(gspread.exceptions.GSpreadException):
+                self.breaker.call(services._to_records, ['Date', 'Date'], [], None)
+        self.assertEqual(self.breaker.status()['state'], 'closed')
+        self.assertEqual(self.breaker.status()['failures'], 0)
+
+
+@override_settings(CACHES=LOCMEM)
+class SheetReadTests(SimpleTestCase):
+    def setUp(self):
+        SheetCache().backend.clear()
+        self.client = FakeClient([['Date', 'sultan', 'sultan running'], ['1/11/2025', '+50', '50']], delay=0)
+        services.set_gspread_client(self.client)
+
+    def tearDown(self):
+        services.set_gspread_client(None)
+
+    def test_located_sheet_is_read_with_one_request(self):
+        services._fetch_sheet('doc', 'log', ['Date'])
+        self.client.http_client.requests.clear()
+        headers, rows = services._fetch_sheet('doc', 'log', ['Date'])
+        self.assertEqual(self.client.opens, 1)
+        self.assertEqual(self.client.http_client.requests, [('values_get', 'sheet-key', "'log'")])
+        self.assertEqual(rows, [{'Date': '1/11/2025', 'sultan': 50, 'sultan running': 50}])
+
+    def test_renamed_tab_is_located_again(self):
+        services._fetch_sheet('doc', None, ['Date'])
+        self.client.http_client.title = 'daily log'
+        headers, rows = services._fetch_sheet('doc', None, ['Date'])
+        self.assertEqual(self.client.opens, 2)
+        self.assertEqual(self.client.http_client.requests[-1], ('values_get', 'sheet-key', "'daily log'"))
+        self.assertEqual(len(rows), 1)
+
+
+@override_settings(CACHES=LOCMEM)
+class IncrementalSyncTests(TestCase):
+    def setUp(self):
+        SheetCache().backend.clear()
+        # A note in an unheaded column makes data rows wider than the header
+        self.values = [['Date', 'sultan', 'sultan running']] + [
+            [f'{day}/11/2025', '+50', str(50 * day)] for day in range(1, 6)
+        ]
+        self.values[1].append('first day')
+        self.client = FakeClient(self.values, delay=0)
+        services.set_gspread_client(self.client)
+
+    def tearDown(self):
+        services.set_gspread_client(None)
+
+    def test_refresh_reads_only_the_tail_and_splices_the_overlap(self):
+        first = services.refresh_snapshot('doc', 'log', ['Date'])
+        self.assertEqual(first.row_count, 5)
+
+        self.values[4][1] = '+70'  # correction within the overlap
+        self.values.append(['6/11/2025', '+50', '320'])
+        self.client.http_client.requests.clear()
+        second = services.refresh_snapshot('doc', 'log', ['Date'])
+
+        keep = 5 - services.SHEETS_SYNC_OVERLAP_ROWS
+        self.assertEqual(self.client.http_client.requests, [
+            ('values_batch_get', 'sheet-key', ("'log'!1:1", f"'log'!A{keep + 2}:D")),
+        ])
+        self.assertEqual(second.version, first.version + 1)
+        self.assertEqual(second.rows[:keep], first.rows[:keep])
+        self.assertEqual([row['sultan'] for row in second.rows], [50, 50, 50, 70, 50, 50])
+        self.assertEqual(second.rows[-1]['Date'], '6/11/2025')
+
+    def test_changed_header_falls_back_to_a_full_read(self):
+        services.refresh_snapshot('doc', 'log', ['Date'])
+        self.values[0] = ['Date', 'sultan', 'sultan running', 'allan']
+        self.client.http_client.requests.clear()
+        snapshot = services.refresh_snapshot('doc', 'log', ['Date'])
+        self.assertEqual([request[0] for request in self.client.http_client.requests], ['values_batch_get', 'values_get'])
+        self.assertEqual(snapshot.headers, ['Date', 'sultan', 'sultan running', 'allan'])
+
+
+@override_settings(CACHES=LOCMEM)
+class WarmRowsTests(TestCase):
+    def setUp(self):
+        SheetCache().backend.clear()
+        services.set_gspread_client(FakeClient([
+            ['Date', 'sultan', 'Allan', 'sultan running', 'Allan running'],
+            ['1/11/2025', '+50', '+20', '50', '20'],
+        ], delay=0))
+        self.group = Group.objects.create(name='Sultan only', slug='sultan', doc_name='doc', sheet_name='log', members=['Sultan'])
+
+    def tearDown(self):
+        services.set_gspread_client(None)
+
+    def test_new_version_is_parsed_before_the_first_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            snapshot = services.refresh_snapshot('doc', 'log', ['Date'])
+
+        with mock.patch('notifier.rows.build_rows', wraps=rows.build_rows) as build_rows:
+            _, members, _, table = _group_table(self.group, snapshot.version, snapshot.rows)
+        build_rows.assert_not_called()
+        self.assertEqual(list(members), ['sultan'])
+        self.assertEqual(len(table), 1)
+
+
+@override_settings(CACHES=LOCMEM)
+class DataWallTests(TestCase):
+    def setUp(self):
+        SheetCache().backend.clear()
+        self.values = [['Date', 'sultan', 'sultan running']] + [
+            [f'{day}/11/2025', '+50', str(50 * day)] for day in range(1, 6)
+        ]
+        self.sheets = FakeClient(self.values, delay=0)
+        services.set_gspread_client(self.sheets)
+        services.refresh_snapshot('doc', 'log', ['Date'])
+        self.group = Group.objects.create(name='Savers', slug='savers', doc_name='doc', sheet_name='log')
+        Group.objects.create(name='Others', slug='others', doc_name='doc', sheet_name='log')
+
+    def tearDown(self):
+        services.set_gspread_client(None)
+
+    def get(self, path='/groups/savers/', **headers):
+        return self.client.get(path, headers=headers)
+
+    def test_unchanged_page_is_not_modified_until_the_snapshot_changes(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+        self.values.append(['6/11/2025', '+50', '300'])
+        services.refresh_snapshot('doc', 'log', ['Date'])
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @mock.patch.object(views, 'DATA_WALL_PAGE_SIZE', 2)
+    def test_table_is_paged_and_filtered(self):
+        def dates(query):
+            response = self.get(f'/groups/savers/?{query}')
+            return [row.date_text for row in response.context['contributions']]
+
+        self.assertEqual(dates(''), ['5/11/2025', '4/11/2025'])
+        self.assertEqual(dates('page=3'), ['1/11/2025'])
+        self.assertEqual(dates('order=oldest'), ['1/11/2025', '2/11/2025'])
+        self.assertEqual(dates('from=2025-11-02&to=2025-11-03&page=1'), ['3/11/2025', '2/11/2025'])
+        self.assertEqual(self.get('/groups/savers/?from=nope').status_code, 400)
+
+    def test_export_streams_csv_and_ndjson(self):
+        response = self.get('/groups/savers/export/?from=2025-11-04')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="savers-contributions.csv"')
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), [
+            'Date,sultan,sultan Balance',
+            '4/11/2025,50,200',
+            '5/11/2025,50,250',
+        ])
+
+        response = self.get('/groups/savers/export/?format=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([line['date'] for line in lines], [f'2025-11-0{day}' for day in range(1, 6)])
+        self.assertEqual(lines[0]['contributions'], {'sultan': {'text': '50', 'amount': '50'}})
+        self.assertEqual(self.get('/groups/savers/export/?format=xml').status_code, 400)
+
+    def test_repeat_view_is_served_from_fragments_until_the_snapshot_changes(self):
+        first = self.get()
+        with mock.patch.object(views, 'get_snapshot_data', wraps=views.get_snapshot_data) as load:
+            repeat = self.get()
+            load.assert_not_called()
+            self.assertEqual(repeat.content, first.content)
+
+            self.values.append(['6/11/2025', '+50', '300'])
+            services.refresh_snapshot('doc', 'log', ['Date'])
+            changed = self.get()
+            load.assert_called_once()
+        self.assertNotIn(b'6/11/2025', first.content)
+        self.assertIn(b'6/11/2025', changed.content)
+
+    def test_group_switcher_change_invalidates_the_page(self):
+        etag = self.get()['ETag']
+        Group.objects.filter(slug='others').update(is_active=False)
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+        etag = self.get()['ETag']
+        other = Group.objects.create(name='Late', slug='late', doc_name='doc', sheet_name='log')
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+        etag = self.get()['ETag']
+        other.name = 'Later'
+        other.save()
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+
+class OffloadTests(SimpleTestCase):
+    async def test_offloaded_view_streams_in_batches_off_the_event_loop(self):
+        threads = set()
+
+        def export_rows():
+            for number in range(70):
+                threads.add(threading.current_thread().name)
+                yield f'{number}\n'
+
+        def view(request):
+            threads.add(threading.current_thread().name)
+            return StreamingHttpResponse(export_rows(), content_type='text/csv')
+
+        with mock.patch.object(aio, 'run_blocking', wraps=aio.run_blocking) as run_blocking:
+            response = await aio.offload(view)(RequestFactory().get('/export/'))
+            self.assertTrue(response.is_async)
+            body = b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(body.decode(), ''.join(f'{number}\n' for number in range(70)))
+        # One hop for the view, then one per batch of 32 rows
+        self.assertEqual(run_blocking.call_count, 1 + 3)
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith('dashboard') for name in threads))
+
+
+class ReminderLogsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user('admin'))
+        now = timezone.now()
+        self.old_day = timezone.localdate(now - timedelta(days=100))
+        tie = now - timedelta(hours=1)
+        logs = [
+            ('sultan', now - timedelta(days=100), 'success'),
+            ('sultan', now - timedelta(days=100), 'failed'),
+            ('allan', now - timedelta(days=100), 'success'),
+            ('sultan', now, 'success'),
+            ('allan', tie, 'success'),
+            ('sultan', tie, 'failed'),
+            ('allan', tie, 'success'),
+            ('allan', now - timedelta(hours=2), 'failed'),
+        ]
+        ReminderLog.objects.bulk_create([
+            ReminderLog(member_name=member, sent_at=sent_at, status=status) for member, sent_at, status in logs
+        ])
+        self.failed = set(ReminderLog.objects.filter(status='failed').values_list('pk', flat=True))
+
+    def pages(self, query=''):
+        """Primary keys on each page of the history, following the 'older' links."""
+        pages = []
+        while query is not None:
+            response = self.client.get(f'/reminder-logs/?{query}')
+            self.assertEqual(response.status_code, 200)
+            pages.append([log.pk for log in response.context['logs']])
+            query = response.context['next_page_query']
+        return pages, response.context['member_stats']
+
+    @mock.patch.object(views, 'REMINDER_LOGS_PAGE_SIZE', 3)
+    def test_history_is_paged_newest_first_across_ties(self):
+        expected = list(ReminderLog.objects.order_by('-sent_at', '-pk').values_list('pk', flat=True))
+        pages, stats = self.pages()
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(stats, {'allan': {'success': 3, 'failed': 1}, 'sultan': {'success': 2, 'failed': 2}})
+
+        failed, _ = self.pages('status=failed')
+        self.assertEqual(sum(failed, []), [pk for pk in expected if pk in self.failed])
+
+    def test_rollup_keeps_member_totals_and_archives_old_logs(self):
+        _, before = self.pages()
+        with tempfile.TemporaryDirectory() as archive:
+            call_command(
+                'rollup_reminder_logs', '--days', '30', '--batch-size', '2', '--archive-dir', archive,
+                stdout=StringIO(),
+            )
+            archived = list(Path(archive).iterdir())
+            self.assertEqual([path.name for path in archived], [f'reminder-logs-{self.old_day.isoformat()}.jsonl.gz'])
+            with gzip.open(archived[0], 'rt', encoding='utf-8') as f:
+                self.assertEqual(len(f.readlines()), 3)
+
+        self.assertEqual(ReminderLog.objects.count(), 5)
+        self.assertEqual(
+            sorted(ReminderLogRollup.objects.values_list('day', 'member_name', 'success', 'failed')),
+            [(self.old_day, 'allan', 1, 0), (self.old_day, 'sultan', 1, 1)],
+        )
+        _, after = self.pages()
+        self.assertEqual(after, before)
+        old = self.old_day.isoformat()
+        _, old_only = self.pages(f'from={old}&to={old}')
+        self.assertEqual(old_only, {'allan': {'success': 1, 'failed': 0}, 'sultan': {'success': 1, 'failed': 1}})
+
+
+class EnqueueRemindersTests(TestCase):
+    def enqueue_at(self, hour, minute):
+        now = timezone.make_aware(datetime(2025, 11, 1, hour, minute))
+        with mock.patch('notifier.jobs.timezone.now', return_value=now):
+            return jobs.enqueue_reminders()
+
+    def test_retry_within_the_hour_returns_the_existing_job(self):
+        job, created = self.enqueue_at(20, 0)
+        retried, retried_created = self.enqueue_at(20, 2)
+        self.assertTrue(created)
+        self.assertFalse(retried_created)
+        self.assertEqual(retried.pk, job.pk)
+
+    def test_second_scheduled_reminder_gets_its_own_job(self):
+        first, _ = self.enqueue_at(20, 0)
+        second, created = self.enqueue_at(21, 0)
+        self.assertTrue(created)
+        self.assertNotEqual(second.pk, first.pk)
+
+
+class SlowConnection:
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        time.sleep(0.05)
+        return len(messages)
+
+
+class RecordingConnection:
+    """Connection that remembers who it sent to; even-numbered recipients are slower."""
+
+    def __init__(self, opened):
+        self.thread = threading.current_thread().name
+        self.recipients = []
+        opened.append(self)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        recipient = messages[0].to[0]
+        time.sleep(0.05 if int(recipient[1:recipient.index('@')]) % 2 == 0 else 0.01)
+        self.recipients.append(recipient)
+        return len(messages)
+
+
+class SendMessagesTests(SimpleTestCase):
+    def messages(self, count):
+        return [EmailMessage('Reminder', 'body', to=[f'm{i}@example.com']) for i in range(count)]
+
+    def test_connection_is_recycled_every_batch(self):
+        opened = []
+        results = send_messages(
+            self.messages(5), batch_size=2, concurrency=1,
+            connection_factory=lambda: RecordingConnection(opened),
+        )
+        self.assertEqual([len(connection.recipients) for connection in opened], [2, 2, 1])
+        self.assertTrue(all(result.sent == 1 for result in results))
+
+    def test_concurrent_workers_batch_and_keep_input_order(self):
+        opened = []
+        messages = self.messages(9)
+        results = send_messages(
+            messages, batch_size=2, concurrency=3,
+            connection_factory=lambda: RecordingConnection(opened),
+        )
+        self.assertEqual([result.message for result in results], messages)
+        self.assertTrue(all(result.sent == 1 for result in results))
+        self.assertEqual(len({connection.thread for connection in opened}), 3)
+        per_thread = {}
+        for connection in opened:
+            # Every connection but a worker's last one carries a full batch
+            self.assertLessEqual(len(connection.recipients), 2)
+            per_thread.setdefault(connection.thread, []).append(len(connection.recipients))
+        for sizes in per_thread.values():
+            self.assertTrue(all(size == 2 for size in sizes[:-1]))
+        self.assertEqual(sum(len(connection.recipients) for connection in opened), 9)
+
+    def test_each_result_records_when_its_delivery_finished(self):
+        started = timezone.now()
+        messages = [EmailMessage('Reminder', 'body', to=[f'{name}@example.com']) for name in 'abc']
+        results = send_messages(messages, concurrency=1, connection_factory=SlowConnection)
+        finished = [result.finished_at for result in results]
+        self.assertTrue(all(result.sent == 1 for result in results))
+        self.assertEqual(finished, sorted(finished))
+        self.assertGreaterEqual(finished[0] - started, timedelta(seconds=0.05))
+        self.assertGreaterEqual(finished[-1] - finished[0], timedelta(seconds=0.1))
+
+
+class FlakyConnection:
+    """Connection that raises the queued errors in turn, then sends."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.closed = 0
+
+    def open(self):
+        pass
+
+    def close(self):
+        self.closed += 1
+
+    def send_messages(self, messages):
+        if self.errors:
+            raise self.errors.pop(0)
+        return len(messages)
+
+
+@mock.patch.object(delivery, 'backoff_delay', return_value=0)
+class DeliverRetryTests(SimpleTestCase):
+    def deliver(self, connection, deadline=60):
+        result = DeliveryResult(EmailMessage('Reminder', 'body', to=['a@example.com']))
+        delivery._deliver(connection, result, deadline)
+        return result
+
+    def test_dropped_connection_and_4xx_reply_are_retried(self, backoff):
+        connection = FlakyConnection(
+            smtplib.SMTPServerDisconnected('gone'),
+            smtplib.SMTPResponseException(421, b'try again later'),
+        )
+        result = self.deliver(connection)
+        self.assertEqual((result.sent, result.attempts), (1, 3))
+        self.assertIsNone(result.error)
+        self.assertEqual(connection.closed, 2)
+
+    def test_5xx_reply_fails_after_one_attempt(self, backoff):
+        result = self.deliver(FlakyConnection(smtplib.SMTPResponseException(554, b'rejected')))
+        self.assertEqual((result.sent, result.attempts), (0, 1))
+        self.assertEqual(result.error.smtp_code, 554)
+
+    def test_refused_recipient_fails_after_one_attempt(self, backoff):
+        refused = smtplib.SMTPRecipientsRefused({'a@example.com': (550, b'no such user')})
+        result = self.deliver(FlakyConnection(refused))
+        self.assertEqual((result.sent, result.attempts), (0, 1))
+        self.assertIs(result.error, refused)
+
+    def test_transient_errors_stop_at_max_attempts(self, backoff):
+        errors = [smtplib.SMTPServerDisconnected('gone')] * 5
+        with mock.patch.object(delivery, 'REMINDER_MAX_ATTEMPTS', 3):
+            result = self.deliver(FlakyConnection(*errors))
+        self.assertEqual((result.sent, result.attempts), (0, 3))
+        self.assertIsInstance(result.error, smtplib.SMTPServerDisconnected)
+
+    def test_deadline_stops_retries(self, backoff):
+        backoff.return_value = 10
+        with mock.patch.object(delivery.time, 'sleep') as sleep:
+            result = self.deliver(FlakyConnection(smtplib.SMTPServerDisconnected('gone')), deadline=5)
+        self.assertEqual((result.sent, result.attempts), (0, 1))
+        sleep.assert_not_called()
+
+
+class FakeImageResponse:
+    def __init__(self, status_code=200, body=b'', headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {'Content-Type': 'image/png', **(headers or {})}
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    def close(self):
+        pass
+
+
+class ImageProxyTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = imageproxy.ImageCache(directory.name, max_bytes=10)
+        self.responses = []
+        self.requests = []
+        patcher = mock.patch.object(imageproxy, 'get_session', return_value=mock.Mock(get=self.upstream_get))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upstream_get(self, url, headers, **kwargs):
+        self.requests.append((url, headers))
+        return self.responses.pop(0)
+
+    def fetch(self, url, *responses):
+        self.responses.extend(responses)
+        content_type, cached_file, chunks = imageproxy.fetch_image(url, self.cache)
+        if cached_file:
+            with cached_file:
+                return content_type, cached_file.read(), True
+        return content_type, b''.join(chunks), False
+
+    def test_only_allowlisted_types_are_proxied(self):
+        for content_type in ('text/html', 'image/svg+xml'):
+            with self.assertRaises(imageproxy.ImageProxyError) as raised:
+                self.fetch('http://img/a', FakeImageResponse(body=b'<svg/>', headers={'Content-Type': content_type}))
+            self.assertEqual(raised.exception.status, 415)
+        self.assertEqual(self.fetch('http://img/a', FakeImageResponse(body=b'png', headers={
+            'Content-Type': 'image/PNG; charset=binary',
+        }))[:2], ('image/png', b'png'))
+
+    @mock.patch.object(imageproxy, 'IMAGE_PROXY_MAX_BYTES', 4)
+    def test_oversize_images_are_refused_or_cut_off(self):
+        with self.assertRaises(imageproxy.ImageProxyError):
+            self.fetch('http://img/a', FakeImageResponse(body=b'12345', headers={'Content-Length': '5'}))
+        # Without a Content-Length the body is cut short and nothing is cached
+        self.assertEqual(self.fetch('http://img/a', FakeImageResponse(body=b'12345'))[1], b'')
+        self.assertIsNone(self.cache.get('http://img/a'))
+
+    def test_least_recently_used_image_is_evicted(self):
+        for url in ('http://img/a', 'http://img/b'):
+            self.fetch(url, FakeImageResponse(body=b'1234'))
+        os.utime(self.cache._paths('http://img/a')[1], (1000, 1000))
+        os.utime(self.cache._paths('http://img/b')[1], (2000, 2000))
+        self.assertTrue(self.fetch('http://img/a')[2])  # hit: a is now the most recent
+        self.fetch('http://img/c', FakeImageResponse(body=b'1234'))
+
+        self.assertIsNone(self.cache.get('http://img/b'))
+        self.assertEqual(self.fetch('http://img/a')[1:], (b'1234', True))
+        self.assertEqual(len(self.requests), 3)
+
+    def test_stale_image_is_revalidated(self):
+        self.fetch('http://img/a', FakeImageResponse(body=b'png', headers={'ETag': '"v1"', 'Cache-Control': 'no-cache'}))
+        self.assertEqual(
+            self.fetch('http://img/a', FakeImageResponse(304, headers={'Cache-Control': 'max-age=60'})),
+            ('image/png', b'png', True),
+        )
+        self.assertEqual(self.requests[-1][1], {'If-None-Match': '"v1"'})
+        self.assertEqual(self.fetch('http://img/a'), ('image/png', b'png', True))
+        self.assertEqual(len(self.requests), 2)
+
+    def test_cached_image_survives_a_concurrent_eviction(self):
+        self.fetch('http://img/a', FakeImageResponse(body=b'png'))
+        _, cached_file, _ = imageproxy.fetch_image('http://img/a', self.cache)
+        with cached_file:
+            self.cache.max_bytes = 0
+            self.cache.evict()
+            self.assertFalse(Path(cached_file.name).exists())
+            self.assertEqual(cached_file.read(), b'png')
+
+
+# A worker that counts twice within one flush interval and then goes idle
+IDLE_WORKER = r'''
+import sys, time
+from notifier.metrics import Registry
+counter = Registry(sys.argv[1], flush_interval=0.1).counter('jobs_total', 'Jobs.')
+counter.inc()
+counter.inc()
+print('ready', flush=True)
+time.sleep(30)
+'''
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_idle_worker_updates_reach_other_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            scraper = Registry(directory, flush_interval=0.1)
+            scraper.counter('jobs_total', 'Jobs.')
+            worker = subprocess.Popen(
+                [sys.executable, '-c', IDLE_WORKER, directory],
+                cwd=str(settings.BASE_DIR), stdout=subprocess.PIPE, text=True,
+            )
+            try:
+                self.assertEqual(worker.stdout.readline().strip(), 'ready')
+                deadline = time.monotonic() + 5
+                while 'jobs_total 2.0' not in scraper.render() and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                self.assertIn('jobs_total 2.0', scraper.render())
+            finally:
+                worker.kill()
+                worker.wait()
@@ -1,9 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .aio import offload
+
+# Under ASGI the dashboard views run on a bounded pool, so Sheets reads and
+# image fetches don't serialize on Django's single sync thread
+dashboard = offload if settings.ASYNC_VIEWS else (lambda view: view)
  
 urlpatterns = [
-  path('', views.data_wall, name='data-wall'),
-  path('proxy-image/', views.proxy_image, name='proxy-image'),
+  path('', dashboard(views.data_wall), name='data-wall'),
+  path('groups/<slug:slug>/', dashboard(views.data_wall), name='group-data-wall'),
+  path('export/', dashboard(views.export_contributions), name='export-contributions'),
+  path('groups/<slug:slug>/export/', dashboard(views.export_contributions), name='group-export-contributions'),
+  path('api/summary/', dashboard(views.api_summary), name='api-summary'),
+  path('api/groups/<slug:slug>/summary/', dashboard(views.api_summary), name='api-group-summary'),
+  path('api/contributions/', dashboard(views.api_contributions), name='api-contributions'),
+  path('api/groups/<slug:slug>/contributions/', dashboard(views.api_contributions), name='api-group-contributions'),
+  path('proxy-image/', dashboard(views.proxy_image), name='proxy-image'),
   path('reminder-logs/', views.reminder_logs, name='reminder-logs'),
   path('cron/send-reminders/', views.trigger_reminders, name='cron-send-reminders'),
+  path('cron/reminder-jobs/<int:job_id>/', views.reminder_job_status, name='cron-reminder-job'),
 ]
\ No newline at end of file
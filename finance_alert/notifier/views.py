@@ -1,92 +1,338 @@
 from django.shortcuts import render
-from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.core.paginator import Paginator
+from django.http import (
+  FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse,
+)
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
-from django.core.management import call_command
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from .services import get_all_rows
-from .models import ReminderLog
-import requests
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.utils.dateparse import parse_date, parse_datetime
+from .groups import get_groups, group_members
+from .cache import SHEETS_CACHE_TTL
+from .services import DAILY_LOG_HEADERS, get_snapshot_data, get_snapshot_version
+from .rows import NewestFirst, filter_rows, sheet_rows
+from .schema import schema_for
+from .summary import snapshot_summaries
+from .imageproxy import ImageProxyError, fetch_image
+from .jobs import REMINDER_JOB_WORKER, enqueue_reminders, start_worker
+from .models import Group, ReminderJob, ReminderLog, ReminderLogRollup, ReminderRun
+import csv
+import hashlib
+import json
 import os
+from itertools import chain
+from datetime import datetime, time, timedelta
+from urllib.parse import urlencode, urlsplit
  
-def data_wall(request):
-  """Display group contribution tracker from Google Sheets.
+# Contribution rows per page of the data wall table
+DATA_WALL_PAGE_SIZE = int(os.getenv("DATA_WALL_PAGE_SIZE", "50"))
+# How long rendered data wall fragments are kept. Their keys include the
+# snapshot version and hash, so a new snapshot never serves old fragments.
+DATA_WALL_FRAGMENT_TTL = int(os.getenv("DATA_WALL_FRAGMENT_TTL", "86400"))
+
+
+def _select_group(slug):
+  """The group for ``slug`` (the first group when no slug) and all groups."""
+  groups = get_groups()
+  group = next((g for g in groups if g.slug == slug), None) if slug else (groups[0] if groups else None)
+  if group is None:
+    raise Http404("No such group")
+  return group, groups
+
+
+def _date_range(request):
+  """The ?from= / ?to= dates (YYYY-MM-DD); ValueError if either is malformed."""
+  dates = []
+  for key in ('from', 'to'):
+    value = request.GET.get(key)
+    parsed = parse_date(value) if value else None
+    if value and parsed is None:
+      raise ValueError(value)
+    dates.append(parsed)
+  return dates
+
+
+def _group_table(group, version, contributions):
+  """Schema, members, per-member summary and typed rows for a group's snapshot."""
+  # Members and their running balance columns come from the sheet header
+  schema = schema_for(group.doc_name, group.sheet_name, version, contributions)
+  members = group_members(group, schema)
+  date_column = schema.date_column or 'Date'
   
-  Fetches daily contributions and running balances for Sultan, Blessing, 
-  Cynthia, and Allan from the 'money mates tracker' Google Sheet.
-  """
-  # Define expected headers to handle duplicate column names
-  expected_headers = [
-    'Date', 'sultan', 'Blessing', 'cynthia', 'Allan',
-    'challenge', 'sultan running', 'blessing running', 
-    'cynthia running', 'Allan running'
-  ]
+  # Summary statistics for every member in one pass over the rows,
+  # memoised per snapshot version
+  summary = snapshot_summaries(
+    group.doc_name, group.sheet_name, version, contributions, members, date_column
+  )
+  
+  # Parsed, typed table rows, built once per snapshot version
+  table = sheet_rows(
+    group.doc_name, group.sheet_name, version, contributions, members, date_column, schema.other_columns
+  )
+  return schema, members, summary, table
+
+
+def _snapshot_key(group):
+  """
+  Hash identifying the data shown for ``group``: the latest snapshot's
+  version and content hash plus the group setup. None until a snapshot
+  exists.
+  """
+  latest = get_snapshot_version(group.doc_name, group.sheet_name)
+  if latest is None:
+    return None
+  parts = (group.slug, group.doc_name, group.sheet_name, group.members, *latest)
+  return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _data_etag(request, slug=None, *extra):
+  """
+  ETag for a group's dashboard data: the snapshot key plus everything else
+  the response depends on (path and query string). Only two cheap
+  queries, so unchanged data is answered with a 304 before any rows are
+  loaded. None (no ETag) until a snapshot exists.
+  """
+  group, _ = _select_group(slug)
+  snapshot_key = _snapshot_key(group)
+  if snapshot_key is None:
+    return None
+  parts = (request.path, sorted(request.GET.lists()), snapshot_key, *extra)
+  return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _page_etag(request, slug=None):
+  # The page also depends on who is signed in and on the group switcher,
+  # which changes whenever a group is added, edited or deactivated
+  groups = Group.objects.filter(is_active=True).aggregate(Max('updated_at'), Count('pk'))
+  return _data_etag(request, slug, request.user.pk, groups['updated_at__max'], groups['pk__count'])
+
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_page_etag)
+def data_wall(request, slug=None):
+  """Display group contribution tracker from Google Sheets.
   
+  Fetches daily contributions and running balances for every member found
+  in the header of the group's Google Sheet (the first active group, or
+  the 'money mates tracker' sheet when no groups are configured).
+
+  The table is paged server-side, newest day first, and can be limited to
+  a date range with ?from= / ?to=; the summary cards always cover the
+  whole sheet.
+  """
+  group, groups = _select_group(slug)
   try:
-    contributions = get_all_rows(
-      "money mates tracker", 
-      "daily log",
-      expected_headers=expected_headers
-    )
-  except Exception as e:
-    # If Google Sheets is unreachable/misconfigured, show a friendly error
-    # instead of crashing the worker
-    contributions = []
-    from django.contrib import messages
-    messages.warning(request, f"Could not load data from Google Sheets: {e}")
+    date_from, date_to = _date_range(request)
+  except ValueError:
+    return HttpResponseBadRequest('Invalid date filter')
   
-  # Calculate summary statistics for each member
-  members = ['sultan', 'Blessing', 'cynthia', 'Allan']
-  summary = {}
+  filters = {key: request.GET[key] for key in ('from', 'to', 'order') if request.GET.get(key)}
   
-  for member in members:
-    # Map member names to their running balance keys (case-sensitive)
-    running_key_map = {
-      'sultan': 'sultan running',
-      'Blessing': 'blessing running',  # lowercase 'b' in sheet
-      'cynthia': 'cynthia running',
-      'Allan': 'Allan running'
-    }
-    running_key = running_key_map.get(member, f"{member} running")
-    contrib_key = member
-    
-    # Get the latest running balance (last non-empty value)
-    latest_balance = None
-    total_contributed = 0
-    days_contributed = 0
+  def load():
+    # Served from the stored snapshot (kept fresh by the background refresher)
+    # so the request never waits on Google Sheets.
+    try:
+      version, contributions = get_snapshot_data(
+        group.doc_name, group.sheet_name, DAILY_LOG_HEADERS
+      )
+    except Exception as e:
+      # If the snapshot can't be read, show a friendly error
+      # instead of crashing the worker
+      version, contributions = 0, []
+      from django.contrib import messages
+      messages.warning(request, f"Could not load data from Google Sheets: {e}")
     
-    for row in contributions:
-      # Get running balance - handle both string and numeric values
-      balance_val = row.get(running_key, '')
-      if balance_val is not None and balance_val != '':
-        balance_val = str(balance_val).strip()
-        if balance_val:
-          latest_balance = balance_val
-      
-      # Get contribution - handle both string and numeric values
-      contrib_val = row.get(contrib_key, '')
-      if contrib_val is not None and contrib_val != '':
-        contrib_val = str(contrib_val).strip()
-      if contrib_val and contrib_val not in ['-', '']:
-        days_contributed += 1
-        # Try to extract numeric value
-        try:
-          amount = float(contrib_val.replace('+', '').replace(',', ''))
-          total_contributed += amount
-        except ValueError:
-          pass
+    schema, members, summary, table = _group_table(group, version, contributions)
     
-    summary[member] = {
-      'balance': latest_balance or '0',
-      'total_contributed': total_contributed,
-      'days_contributed': days_contributed
+    rows = filter_rows(table, date_from, date_to)
+    oldest_first = request.GET.get('order') == 'oldest'
+    page = Paginator(rows if oldest_first else NewestFirst(rows), DATA_WALL_PAGE_SIZE).get_page(request.GET.get('page'))
+    return {
+      'contributions': page.object_list,
+      'page': page,
+      'total_rows': len(table),
+      'members': list(members),
+      'other_columns': schema.other_columns,
+      'summary': summary,
     }
   
+  # The summary cards and the table are cached as rendered fragments keyed
+  # on the snapshot, so a repeat view of unchanged data neither loads rows
+  # nor renders them; the data is only loaded if a fragment has to be
+  # rendered. Before the first snapshot exists, load up front (the inline
+  # fetch may fail and add a message) and don't cache.
+  fragment_key = _snapshot_key(group)
+  data = SimpleLazyObject(load) if fragment_key else load()
+  context = {
+    name: SimpleLazyObject(lambda name=name: data[name]) if fragment_key else data[name]
+    for name in ('contributions', 'page', 'total_rows', 'members', 'other_columns', 'summary')
+  }
+  
   return render(request, 'data_wall.html', {
-    'contributions': contributions,
-    'summary': summary
+    **context,
+    'filters': filters,
+    'filter_query': urlencode(filters),
+    'fragment_key': fragment_key,
+    'fragment_ttl': DATA_WALL_FRAGMENT_TTL if fragment_key else 0,
+    'page_number': request.GET.get('page', '1'),
+    'group': group,
+    'groups': groups,
   })
 
+
+def _row_json(row, members, other_columns):
+  """A typed table row as JSON-ready data (amounts as decimal strings)."""
+  def cells(row_cells):
+    return {
+      member: {'text': cell.text, 'amount': str(cell.amount) if cell.amount is not None else None}
+      for member, cell in zip(members, row_cells)
+    }
+
+  return {
+    'position': row.position,
+    'date': row.date.isoformat() if row.date else None,
+    'date_text': row.date_text,
+    'contributions': cells(row.contributions),
+    'balances': cells(row.balances),
+    'other': dict(zip(other_columns, row.other)),
+  }
+
+
+class _Echo:
+  """File-like object whose write() hands the line back, for csv.writer streaming."""
+
+  def write(self, value):
+    return value
+
+
+def export_contributions(request, slug=None):
+  """
+  Full contribution history of a group as CSV (default) or NDJSON
+  (?format=ndjson), oldest day first, optionally limited with ?from= /
+  ?to=. The response is streamed and each line is generated as it is sent.
+  """
+  group, _ = _select_group(slug)
+  export_format = request.GET.get('format', 'csv')
+  if export_format not in ('csv', 'ndjson'):
+    return HttpResponseBadRequest('format must be csv or ndjson')
+  try:
+    date_from, date_to = _date_range(request)
+  except ValueError:
+    return HttpResponseBadRequest('Invalid date filter')
+
+  try:
+    version, contributions = get_snapshot_data(
+      group.doc_name, group.sheet_name, DAILY_LOG_HEADERS
+    )
+  except Exception:
+    return HttpResponse(status=503)
+  schema, members, _, table = _group_table(group, version, contributions)
+  rows = filter_rows(table, date_from, date_to)
+  member_names = list(members)
+
+  if export_format == 'csv':
+    writer = csv.writer(_Echo())
+    header = ['Date', *member_names, *(f'{m} Balance' for m in member_names), *schema.other_columns]
+    lines = chain(
+      [writer.writerow(header)],
+      (
+        writer.writerow([
+          row.date_text,
+          *(cell.text for cell in row.contributions),
+          *(cell.text for cell in row.balances),
+          *row.other,
+        ])
+        for row in rows
+      ),
+    )
+    content_type = 'text/csv'
+  else:
+    lines = (json.dumps(_row_json(row, member_names, schema.other_columns)) + '\n' for row in rows)
+    content_type = 'application/x-ndjson'
+
+  response = StreamingHttpResponse(lines, content_type=content_type)
+  response['Content-Disposition'] = f'attachment; filename="{group.slug}-contributions.{export_format}"'
+  return response
+
+# Upper bound for ?per_page= on the contributions API
+API_MAX_PAGE_SIZE = 500
+
+
+def _api_group_data(group):
+  version, contributions = get_snapshot_data(
+    group.doc_name, group.sheet_name, DAILY_LOG_HEADERS
+  )
+  schema, members, summary, table = _group_table(group, version, contributions)
+  return version, schema, members, summary, table
+
+
+@require_http_methods(["GET", "HEAD"])
+@cache_control(public=True, max_age=SHEETS_CACHE_TTL)
+@condition(etag_func=_data_etag)
+def api_summary(request, slug=None):
+  """Per-member balance summary for a group, as JSON."""
+  group, _ = _select_group(slug)
+  try:
+    version, _, members, summary, _ = _api_group_data(group)
+  except Exception as e:
+    return JsonResponse({'ok': False, 'error': str(e)}, status=503)
+
+  return JsonResponse({
+    'ok': True,
+    'group': {'name': group.name, 'slug': group.slug},
+    'version': version,
+    'members': list(members),
+    'summary': {
+      member: {**data, 'date': data['date'].isoformat() if data['date'] else None}
+      for member, data in summary.items()
+    },
+  })
+
+
+@require_http_methods(["GET", "HEAD"])
+@cache_control(public=True, max_age=SHEETS_CACHE_TTL)
+@condition(etag_func=_data_etag)
+def api_contributions(request, slug=None):
+  """
+  One page of a group's contribution rows, as JSON. Accepts the same
+  ?page=, ?from=, ?to= and ?order=oldest parameters as the data wall, plus
+  ?per_page= (up to API_MAX_PAGE_SIZE).
+  """
+  try:
+    date_from, date_to = _date_range(request)
+    per_page = int(request.GET.get('per_page') or DATA_WALL_PAGE_SIZE)
+  except ValueError:
+    return JsonResponse({'ok': False, 'error': 'Invalid date filter or per_page'}, status=400)
+  per_page = max(1, min(per_page, API_MAX_PAGE_SIZE))
+
+  group, _ = _select_group(slug)
+  try:
+    version, schema, members, _, table = _api_group_data(group)
+  except Exception as e:
+    return JsonResponse({'ok': False, 'error': str(e)}, status=503)
+
+  rows = filter_rows(table, date_from, date_to)
+  oldest_first = request.GET.get('order') == 'oldest'
+  page = Paginator(rows if oldest_first else NewestFirst(rows), per_page).get_page(request.GET.get('page'))
+  member_names = list(members)
+  return JsonResponse({
+    'ok': True,
+    'group': {'name': group.name, 'slug': group.slug},
+    'version': version,
+    'members': member_names,
+    'page': page.number,
+    'num_pages': page.paginator.num_pages,
+    'count': page.paginator.count,
+    'per_page': per_page,
+    'results': [_row_json(row, member_names, schema.other_columns) for row in page.object_list],
+  })
+
+
 def proxy_image(request):
   """Simple image proxy view.
 
@@ -94,26 +340,53 @@ def proxy_image(request):
   image server-side and streams it back to the client with the original
   Content-Type. This helps when external image URLs are protected or when
   the browser blocks loading them due to CORS or mixed-content issues.
+
+  Upstream connections are pooled, only allowlisted image types up to
+  IMAGE_PROXY_MAX_BYTES are passed on, and images are kept in an on-disk
+  LRU cache (revalidated with ETag / Last-Modified once stale), so a
+  repeated image is served locally (see notifier.imageproxy).
   """
   url = request.GET.get('url')
   if not url:
     return HttpResponseBadRequest('Missing url param')
+  if urlsplit(url).scheme not in ('http', 'https'):
+    return HttpResponseBadRequest('Only http(s) URLs can be proxied')
 
   try:
-    resp = requests.get(url, stream=True, timeout=10)
-  except requests.RequestException:
-    return HttpResponse(status=502)
-
-  if resp.status_code != 200:
-    return HttpResponse(status=resp.status_code)
+    content_type, cached_file, chunks = fetch_image(url)
+  except ImageProxyError as e:
+    return HttpResponse(str(e), status=e.status, content_type='text/plain')
 
-  content_type = resp.headers.get('Content-Type', 'application/octet-stream')
-  response = HttpResponse(resp.raw, content_type=content_type)
+  if cached_file:
+    response = FileResponse(cached_file, content_type=content_type)
+  else:
+    response = StreamingHttpResponse(chunks, content_type=content_type)
   # Let the browser cache the image for a short period (adjust as needed)
   response['Cache-Control'] = 'public, max-age=600'
+  response['X-Content-Type-Options'] = 'nosniff'
   return response
 
 
+# Reminder logs shown per page of history
+REMINDER_LOGS_PAGE_SIZE = 100
+
+
+def _day_start(day):
+  return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _encode_cursor(log):
+  return f"{log.sent_at.isoformat()}~{log.pk}"
+
+
+def _decode_cursor(value):
+  sent_at, _, pk = value.rpartition('~')
+  parsed = parse_datetime(sent_at)
+  if parsed is None or not pk.isdigit():
+    raise ValueError(value)
+  return parsed, int(pk)
+
+
 @login_required
 def reminder_logs(request):
   """
@@ -121,47 +394,159 @@ def reminder_logs(request):
   
   Shows only member names, timestamps, status, and balance - no email addresses
   for data protection.
+
+  History is paged with a keyset cursor on (sent_at, id) rather than an
+  OFFSET, and can be filtered by status and a from/to date range, so each
+  page costs the same however many logs exist.
   """
-  logs = ReminderLog.objects.all().order_by('-sent_at')[:100]  # Last 100 logs
+  status = request.GET.get('status', '')
+  if status and status not in dict(ReminderLog.STATUS_CHOICES):
+    return HttpResponseBadRequest('Invalid status')
+  try:
+    date_from, date_to = _date_range(request)
+    cursor = _decode_cursor(request.GET['before']) if request.GET.get('before') else None
+  except ValueError:
+    return HttpResponseBadRequest('Invalid filter')
+
+  # Date range on the raw column (not sent_at__date) so indexes apply
+  in_range = ReminderLog.objects.all()
+  if date_from:
+    in_range = in_range.filter(sent_at__gte=_day_start(date_from))
+  if date_to:
+    in_range = in_range.filter(sent_at__lt=_day_start(date_to + timedelta(days=1)))
+
+  logs = in_range.filter(status=status) if status else in_range
+  if cursor:
+    sent_at, pk = cursor
+    logs = logs.filter(Q(sent_at__lt=sent_at) | Q(sent_at=sent_at, pk__lt=pk))
+  logs = list(logs.order_by('-sent_at', '-pk')[:REMINDER_LOGS_PAGE_SIZE + 1])
+  next_cursor = None
+  if len(logs) > REMINDER_LOGS_PAGE_SIZE:
+    logs = logs[:REMINDER_LOGS_PAGE_SIZE]
+    next_cursor = _encode_cursor(logs[-1])
   
-  # Group by member for quick stats
+  # Per-member success/failure counts, aggregated in the database. Days
+  # past the retention window only exist as daily rollups, so add those.
+  rollups = ReminderLogRollup.objects.all()
+  if date_from:
+    rollups = rollups.filter(day__gte=date_from)
+  if date_to:
+    rollups = rollups.filter(day__lte=date_to)
   member_stats = {}
-  for log in ReminderLog.objects.all():
-    if log.member_name not in member_stats:
-      member_stats[log.member_name] = {'success': 0, 'failed': 0}
-    member_stats[log.member_name][log.status] += 1
-  
+  counts = in_range.order_by().values('member_name', 'status').annotate(count=Count('id'))
+  for row in counts.order_by('member_name'):
+    stats = member_stats.setdefault(row['member_name'], {'success': 0, 'failed': 0})
+    stats[row['status']] += row['count']
+  for row in rollups.order_by().values('member_name').annotate(success=Sum('success'), failed=Sum('failed')):
+    stats = member_stats.setdefault(row['member_name'], {'success': 0, 'failed': 0})
+    stats['success'] += row['success']
+    stats['failed'] += row['failed']
+  member_stats = dict(sorted(member_stats.items()))
+
+  filters = {key: request.GET[key] for key in ('status', 'from', 'to') if request.GET.get(key)}
   return render(request, 'reminder_logs.html', {
     'logs': logs,
-    'member_stats': member_stats
+    'member_stats': member_stats,
+    'runs': ReminderRun.objects.all()[:10],
+    'filters': filters,
+    'page_size': REMINDER_LOGS_PAGE_SIZE,
+    'is_first_page': cursor is None,
+    'first_page_query': urlencode(filters),
+    'next_page_query': urlencode({**filters, 'before': next_cursor}) if next_cursor else None,
   })
 
 
+def _check_cron_key(request):
+  """Error response unless the request carries REMINDER_CRON_KEY (?key=... or X-Reminder-Key)."""
+  provided = request.GET.get('key') or request.headers.get('X-Reminder-Key')
+  expected = os.getenv('REMINDER_CRON_KEY')
+  if not expected:
+    return JsonResponse({'ok': False, 'error': 'Server not configured with REMINDER_CRON_KEY'}, status=500)
+  if provided != expected:
+    return JsonResponse({'ok': False, 'error': 'Unauthorized'}, status=401)
+  return None
+
+
 @csrf_exempt
 @require_http_methods(["POST", "GET"])  # allow GET for simple external schedulers
 def trigger_reminders(request):
   """
   Secure endpoint to trigger daily reminders from an external scheduler.
   Provide the token via ?key=... or header X-Reminder-Key.
+
+  The run is queued and handled by the reminder job worker; the response
+  (202) carries the job id to poll. Triggering the same day/group/options
+  again within the hour returns the existing job instead of sending twice.
   """
-  provided = request.GET.get('key') or request.headers.get('X-Reminder-Key')
-  expected = os.getenv('REMINDER_CRON_KEY')
-  if not expected:
-    return JsonResponse({'ok': False, 'error': 'Server not configured with REMINDER_CRON_KEY'}, status=500)
-  if provided != expected:
-    return JsonResponse({'ok': False, 'error': 'Unauthorized'}, status=401)
+  error = _check_cron_key(request)
+  if error:
+    return error
 
   dry_run = request.GET.get('dry', '').lower() in ('1', 'true', 'yes')
   only = request.GET.get('only')  # e.g., "Allan" or "Allan,Blessing"
-  args = []
-  kwargs = {}
-  if dry_run:
-    args.append('--dry-run')
-  if only:
-    args.extend(['--only', *[m.strip() for m in only.split(',') if m.strip()]])
+  group = request.GET.get('group')  # e.g., "money-mates" or "money-mates,family"
 
   try:
-    call_command('send_daily_reminders', *args, **kwargs)
-    return JsonResponse({'ok': True})
+    job, created = enqueue_reminders(
+      groups=[g.strip() for g in (group or '').split(',') if g.strip()],
+      only=[m.strip() for m in (only or '').split(',') if m.strip()],
+      dry_run=dry_run,
+    )
   except Exception as e:
     return JsonResponse({'ok': False, 'error': str(e)}, status=500)
+
+  if REMINDER_JOB_WORKER == 'thread':
+    start_worker()
+  return JsonResponse({
+    'ok': True,
+    'job_id': job.pk,
+    'status': job.status,
+    'duplicate': not created,
+    'status_url': reverse('cron-reminder-job', args=[job.pk]),
+  }, status=202)
+
+
+@require_http_methods(["GET"])
+def reminder_job_status(request, job_id):
+  """
+  Progress and per-recipient results of a queued reminder job.
+  Requires the same key as trigger_reminders.
+  """
+  error = _check_cron_key(request)
+  if error:
+    return error
+
+  try:
+    job = ReminderJob.objects.get(pk=job_id)
+  except ReminderJob.DoesNotExist:
+    return JsonResponse({'ok': False, 'error': 'Job not found'}, status=404)
+
+  results = [
+    {
+      'group': log.run.group_name,
+      'member': log.member_name,
+      'status': log.status,
+      'attempts': log.attempts,
+      'error': log.error_message or '',
+    }
+    for log in ReminderLog.objects.filter(run__job=job).select_related('run').order_by('run_id', 'id')
+  ]
+  duration = job.duration
+  return JsonResponse({
+    'ok': True,
+    'job': {
+      'id': job.pk,
+      'key': job.key,
+      'status': job.status,
+      'dry_run': job.dry_run,
+      'created_at': job.created_at.isoformat(),
+      'started_at': job.started_at.isoformat() if job.started_at else None,
+      'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+      'duration_seconds': round(duration.total_seconds(), 3) if duration is not None else None,
+      'progress': {'groups_done': job.groups_done, 'groups_total': job.groups_total},
+      'sent': job.sent,
+      'failed': job.failed,
+      'error': job.error,
+      'results': results,
+    },
+  })